@@ -2,11 +2,14 @@
 import streamlit as st
 import time
 import numpy as np
-from core.websocket_client import OKXWebSocketClient
-from models.market_impact import MarketImpactCalculator
-from models.slippage import SlippageModel
-from models.maker_taker import MakerTakerPredictor
-from config import FEE_TIERS, SYMBOL
+import pandas as pd
+import altair as alt
+from queue import Empty
+from core.engine import CostEngine
+from core.registry import get_feeds, get_models, get_learner
+from core.websocket_client import LIVE
+from models.monte_carlo import MonteCarloSimulator
+from config import FEE_TIERS, SYMBOL, ONLINE_LEARNING
 import requests
 
 def check_vpn_connection():
@@ -18,14 +21,11 @@ def check_vpn_connection():
 
 def main():
     st.set_page_config(page_title="Crypto Trade Simulator", layout="wide")
+    # Feed and models are shared by every session in this process
+    feeds = get_feeds()
+    model_registry = get_models()
     if 'running' not in st.session_state:
         st.session_state['running'] = False
-    if 'client' not in st.session_state:
-        st.session_state['client'] = OKXWebSocketClient()
-    if 'last_update' not in st.session_state:
-        st.session_state['last_update'] = time.time()
-    if 'models_initialized' not in st.session_state:
-        st.session_state['models_initialized'] = False
     # VPN Connection Check
     if not check_vpn_connection():
         st.error("""
@@ -36,38 +36,16 @@ def main():
         """)
         return
 
-    # Initialize session state
-    # if 'running' not in st.session_state:
-    #     st.session_state.update({
-    #         'running': False,
-    #         'client': OKXWebSocketClient(),
-    #         'last_update': time.time(),
-    #         'models_initialized': False
-    #     })
-
-    # Initialize models with error handling
-    if not st.session_state.models_initialized:
+    # Load the shared models once per process, with error handling
+    if not model_registry.loaded:
         progress_bar = st.progress(0)
         status_text = st.empty()
         try:
             status_text.markdown("🔄 Loading models...")
             progress_bar.progress(30)
-            slippage_model = SlippageModel()
-            slippage_model.load()
-            progress_bar.progress(60)
-            maker_taker_model = MakerTakerPredictor()
-            maker_taker_model.load()
-            progress_bar.progress(90)
-            impact_model = MarketImpactCalculator()
-            impact_model.load()
-            st.session_state.models = {
-                'slippage': slippage_model,
-                'maker_taker': maker_taker_model,
-                'impact': impact_model
-            }
+            model_registry.get()
             progress_bar.progress(100)
             status_text.markdown("✅ Models loaded successfully!")
-            st.session_state.models_initialized = True
             time.sleep(1)
             status_text.empty()
         except Exception as e:
@@ -76,9 +54,15 @@ def main():
             ❌ Model loading failed!
             Error: {str(e)}
             """)
-            st.session_state.models_initialized = False
             return
 
+    # Live trades keep the maker/taker and slippage models current in the background
+    learner = get_learner() if ONLINE_LEARNING else None
+
+    # Each session only owns a light engine bound to the shared feed and models
+    if 'engine' not in st.session_state:
+        st.session_state['engine'] = CostEngine(feeds.client, model_registry.get(), SYMBOL, registry=model_registry)
+
     # Control Panel
     with st.sidebar:
         st.header("🎮 Control Panel")
@@ -92,12 +76,14 @@ def main():
     
         if start_btn and not st.session_state.running:
             st.session_state.running = True
-            if not st.session_state.client.running:
-                st.session_state.client.start()
+            st.session_state.symbol = st.session_state.get('symbol', SYMBOL)
+            feeds.acquire(st.session_state.symbol)
+            st.session_state.engine.start()
     
         if stop_btn and st.session_state.running:
             st.session_state.running = False
-            st.session_state.client.stop()
+            st.session_state.engine.stop()
+            feeds.release(st.session_state.symbol)
     
         # --- Input Parameters ---
         st.header("⚙️ Trade Parameters")
@@ -115,7 +101,15 @@ def main():
             "Spot Asset (Symbol)",
             value=SYMBOL,
             help="Enter the trading pair symbol, e.g., BTC-USDT"
-        )
+        ).strip().upper()
+
+        # Switch this session to the selected instrument without restarting the feed
+        previous_asset = st.session_state.get('symbol', SYMBOL)
+        if spot_asset and spot_asset != previous_asset:
+            if st.session_state.running:
+                feeds.acquire(spot_asset)
+                feeds.release(previous_asset)
+            st.session_state.symbol = spot_asset
     
         # 3. Order Type (only 'market' supported)
         order_type = st.selectbox(
@@ -144,6 +138,11 @@ def main():
             step=0.1,
             help="Expected market volatility (%)"
         )
+        live_volatility = st.checkbox(
+            "Use live volatility",
+            value=True,
+            help="Price with volatility measured from the order book; the slider is used until enough ticks arrive or when unchecked"
+        )
     
         # 6. Fee Tier
         fee_tier = st.selectbox(
@@ -154,6 +153,9 @@ def main():
     
     # Main Display
     st.header("📈 Real-Time Trading Metrics")
+    # Shown while the book isn't live, so stale numbers aren't taken as current
+    feed_status = st.empty()
+    feed_state = None
     
     # Create columns for metrics
     col1, col2 = st.columns(2)
@@ -167,83 +169,253 @@ def main():
         'maker_taker': col2.empty(),
         'latency': col2.empty()
     }
+    # History from the engine's fixed-size buckets, decimated to the chart width
+    with st.expander("📈 History", expanded=True):
+        history_col1, history_col2, history_col3 = st.columns(3)
+        history_labels = {
+            'net_cost': "Total cost (USD)",
+            'mid_price': "Mid price",
+            'spread': "Spread",
+            'liquidity': "Liquidity",
+            'slippage': "Slippage",
+            'market_impact': "Market impact"
+        }
+        history_field = history_col1.selectbox(
+            "Metric", list(history_labels), format_func=history_labels.get
+        )
+        history_resolution = history_col2.selectbox(
+            "Bucket", st.session_state.engine.history.resolutions,
+            format_func=lambda ms: f"{ms // 1000}s" if ms < 60_000 else f"{ms // 60_000}m"
+        )
+        history_stat = history_col3.selectbox("Statistic", ['close', 'mean', 'high', 'low', 'open'])
+        history_chart = st.empty()
+    with st.expander("⏱️ Pipeline latency by stage"):
+        latency_table = st.empty()
+        cache_stats = st.empty()
+    latency_refreshed = 0.0
 
-    # Main simulation loop
-    while st.session_state.running:
-        try:
-            loop_start = time.perf_counter()
-            data_start = time.perf_counter()
-            order_book = st.session_state.client.order_book
-            
-            if not order_book or order_book.mid_price == 0:
-                time.sleep(0.5)
-                continue
-            
-            # Convert USD to asset quantity using current mid price
-            quantity = quantity_usd / order_book.mid_price
-            # Calculate market features
+    # Push the current inputs to the engine; it reprices on the next book update
+    engine = st.session_state.engine
+    engine.configure(
+        symbol=spot_asset,
+        quantity_usd=quantity_usd,
+        volatility=volatility / 100,
+        fee_tier=fee_tier,
+        live_volatility=live_volatility
+    )
 
-            best_bid = max(order_book.bids.keys()) if order_book.bids else 0
-            best_ask = min(order_book.asks.keys()) if order_book.asks else 0
-            spread = (best_ask - best_bid) / order_book.mid_price if best_ask and best_bid else 0
-            liquidity = order_book.get_liquidity_depth()
-            
-            # Prepare model inputs
-            order_size_ratio = quantity / liquidity if liquidity > 0 else 0
-            current_volatility = volatility / 100
-            data_end = time.perf_counter()
-            data_latency = (data_end - data_start) * 1000  # ms
-            
-            # Model predictions
-            model_start = time.perf_counter()
-            slippage = st.session_state.models['slippage'].predict(
-                order_size_ratio, 
-                current_volatility,
-                spread
-            )['linear']
-            
-            maker_prob = st.session_state.models['maker_taker'].predict_probability(
-                quantity,
-                spread
+    # Cost surface over size x volatility for the selected fee tier
+    with st.expander("🗺️ Cost surface (size × volatility)"):
+        surface_col1, surface_col2 = st.columns(2)
+        max_size = surface_col1.number_input(
+            "Largest order (~USD)", min_value=100.0, max_value=10_000_000.0, value=100_000.0, step=1000.0
+        )
+        max_vol = surface_col2.slider("Highest volatility (%)", min_value=0.5, max_value=20.0, value=10.0, step=0.5)
+        order_book = feeds.client.get_book(spot_asset)
+        if order_book is not None and order_book.mid_price:
+            surface = engine.cost_surface(
+                np.geomspace(10.0, max_size, 100),
+                np.linspace(0.001, max_vol / 100, 50),
+                [fee_tier]
             )
-            
-            # Cost calculations
-            order_value = quantity * order_book.mid_price
-            fees = order_value * FEE_TIERS[fee_tier]['taker']
-            market_impact = st.session_state.models['impact'].calculate_impact(
-                quantity, 
-                current_volatility,
-                liquidity
+            cost_bps = surface['total_cost'][:, :, 0] / surface['order_value'][:, None] * 1e4
+            # Cell edges: sizes are log-spaced, volatilities linear
+            size_step = np.sqrt(surface['sizes_usd'][1] / surface['sizes_usd'][0])
+            vol_step = (surface['volatilities'][1] - surface['volatilities'][0]) * 100 / 2
+            sizes, vols = np.meshgrid(surface['sizes_usd'], surface['volatilities'] * 100, indexing='ij')
+            grid = pd.DataFrame({
+                'size_usd': sizes.ravel(),
+                'size_lo': sizes.ravel() / size_step,
+                'size_hi': sizes.ravel() * size_step,
+                'volatility_pct': vols.ravel(),
+                'vol_lo': vols.ravel() - vol_step,
+                'vol_hi': vols.ravel() + vol_step,
+                'cost_bps': cost_bps.ravel()
+            })
+            st.altair_chart(
+                alt.Chart(grid).mark_rect().encode(
+                    x=alt.X('size_lo:Q', scale=alt.Scale(type='log'), title="Order size (USD)"),
+                    x2='size_hi:Q',
+                    y=alt.Y('vol_lo:Q', title="Volatility (%)"),
+                    y2='vol_hi:Q',
+                    color=alt.Color('cost_bps:Q', title="Cost (bps)"),
+                    tooltip=['size_usd', 'volatility_pct', 'cost_bps']
+                ),
+                use_container_width=True
+            )
+        else:
+            st.info("Start the feed to price the cost surface against the live book.")
+
+    # Almgren-Chriss schedule and cost/risk frontier for the current order
+    with st.expander("📉 Execution schedule (Almgren–Chriss)"):
+        impact_model = engine.models['impact']
+        order_book = feeds.client.get_book(spot_asset)
+        if not impact_model.calibrated:
+            st.info("Impact coefficients are not calibrated; train with recorded books to enable schedules.")
+        elif order_book is None or not order_book.mid_price:
+            st.info("Start the feed to plan against the live book.")
+        else:
+            plan_col1, plan_col2 = st.columns(2)
+            horizon = plan_col1.number_input("Horizon (s)", min_value=10.0, max_value=86_400.0, value=300.0, step=10.0)
+            slices = plan_col2.number_input("Child orders (at least)", min_value=1, max_value=500, value=10)
+            with order_book.lock:
+                mid = order_book.mid_price
+                # Plan with the volatility the engine prices with
+                plan_volatility, volatility_source = engine.volatility_for(order_book)
+            size = quantity_usd / mid
+            plan = impact_model.plan(size, mid, plan_volatility, horizon, slices)
+            st.caption(
+                f"Expected cost ${float(plan['expected_cost']):,.2f} ± ${float(plan['std']):,.2f} "
+                f"(λ={impact_model.risk_aversion}, σ={plan_volatility * 100:.2f}% {volatility_source})"
+            )
+            st.altair_chart(
+                alt.Chart(pd.DataFrame({'time_s': plan['times'], 'holdings': plan['holdings']})).mark_line().encode(
+                    x=alt.X('time_s:Q', title="Time (s)"),
+                    y=alt.Y('holdings:Q', title="Remaining quantity")
+                ),
+                use_container_width=True
+            )
+            frontier = impact_model.frontier(
+                size, mid, plan_volatility,
+                np.geomspace(10.0, 3_600.0, 40), np.geomspace(1e-6, 10.0, 40)
+            )
+            lambdas, horizons = np.meshgrid(frontier['risk_aversions'], frontier['horizons'], indexing='ij')
+            points = pd.DataFrame({
+                'std_usd': frontier['std'].ravel(),
+                'cost_usd': frontier['expected_cost'].ravel(),
+                'horizon_s': horizons.ravel(),
+                'risk_aversion': lambdas.ravel()
+            }).dropna()
+            st.altair_chart(
+                alt.Chart(points).mark_circle(size=20).encode(
+                    x=alt.X('std_usd:Q', title="Cost std (USD)"),
+                    y=alt.Y('cost_usd:Q', title="Expected cost (USD)"),
+                    color=alt.Color('horizon_s:Q', scale=alt.Scale(type='log'), title="Horizon (s)"),
+                    tooltip=['horizon_s', 'risk_aversion', 'cost_usd', 'std_usd']
+                ),
+                use_container_width=True
+            )
+
+    # Cost distribution of the order split over time, by Monte Carlo
+    with st.expander("🎲 Cost distribution (Monte Carlo)"):
+        order_book = feeds.client.get_book(spot_asset)
+        if order_book is None or not order_book.mid_price:
+            st.info("Start the feed to simulate against the live book.")
+        else:
+            mc_col1, mc_col2, mc_col3 = st.columns(3)
+            mc_horizon = mc_col1.number_input(
+                "Horizon (s)", min_value=1.0, max_value=86_400.0, value=300.0, step=10.0, key='mc_horizon'
             )
-            net_cost = order_value + fees + (slippage * order_value) + (market_impact * order_value)
-            model_end = time.perf_counter()
-            model_latency = (model_end - model_start) * 1000  # ms
+            mc_slices = mc_col2.number_input("Child orders", min_value=1, max_value=500, value=10, key='mc_slices')
+            source = mc_col3.radio("Paths", ["Live book", "Recent books"])
+            # Small enough to run in-process; the pool pays off for larger runs
+            simulator = MonteCarloSimulator(workers=1)
+            if st.button(f"Simulate {simulator.paths:,} paths"):
+                impact_model = engine.models['impact']
+                with order_book.lock:
+                    mid = order_book.mid_price
+                    plan_volatility, volatility_source = engine.volatility_for(order_book)
+                size = quantity_usd / mid
+                # Almgren-Chriss schedule when calibrated, otherwise equal slices (TWAP)
+                if impact_model.calibrated:
+                    schedule = impact_model.plan(size, mid, plan_volatility, mc_horizon, mc_slices)['trades']
+                    permanent_impact = impact_model.gamma
+                else:
+                    schedule = np.full(int(mc_slices), size / mc_slices)
+                    permanent_impact = 0.0
+                interval = mc_horizon / len(schedule)
+                fee_rate = FEE_TIERS[fee_tier]['taker']
+                try:
+                    if source == "Recent books":
+                        snapshots = feeds.client.ticks[spot_asset].latest().copy()
+                        distribution = simulator.bootstrap(
+                            snapshots, schedule, interval, permanent_impact=permanent_impact, fee_rate=fee_rate
+                        )
+                    else:
+                        # The book's measured volatility when live, else the slider's
+                        distribution = simulator.simulate(
+                            order_book, schedule, interval, plan_volatility,
+                            permanent_impact=permanent_impact, fee_rate=fee_rate
+                        )
+                except ValueError as e:
+                    st.warning(f"{e}; try a shorter horizon or wait for more history.")
+                else:
+                    quantiles = distribution['quantiles']
+                    paths_from = (
+                        "recorded books" if source == "Recent books"
+                        else f"σ {plan_volatility * 100:.2f}% ({volatility_source})"
+                    )
+                    st.caption(
+                        f"Mean ${distribution['mean']:,.2f} | median ${quantiles[0.5]:,.2f} | "
+                        f"p95 ${quantiles[0.95]:,.2f} | p99 ${quantiles[0.99]:,.2f} | "
+                        f"ES95 ${distribution['expected_shortfall_95']:,.2f} | fill {distribution['fill_rate']:.1%} | "
+                        f"{paths_from}"
+                    )
+                    st.altair_chart(
+                        alt.Chart(pd.DataFrame({'cost_usd': distribution['costs']})).mark_bar().encode(
+                            x=alt.X('cost_usd:Q', bin=alt.Bin(maxbins=60), title="Cost (USD)"),
+                            y=alt.Y('count():Q', title="Paths")
+                        ),
+                        use_container_width=True
+                    )
 
-            # Latency calculation
-            latency_ms = (time.time() - st.session_state.last_update) * 1000
-            st.session_state.last_update = time.time()
+    if 'updates' not in st.session_state:
+        st.session_state['updates'] = engine.listen()
+    updates = st.session_state.updates
+
+    # Main simulation loop: render each result as the engine publishes it
+    while st.session_state.running:
+        try:
+            state = feeds.client.book_state(spot_asset)
+            if state != feed_state:
+                feed_state = state
+                if state == LIVE:
+                    feed_status.empty()
+                else:
+                    health = feeds.client.health
+                    error = f" ({health['last_error']})" if health['last_error'] else ""
+                    feed_status.warning(
+                        f"📡 Feed {health['state']}, {spot_asset} book {state}{error}. "
+                        "Costs are paused until the book resyncs."
+                    )
+            try:
+                result = updates.get(timeout=1.0)
+            except Empty:
+                continue
+
+            slippage = result['slippage']
+            book_slippage = result['book_slippage']
+            book_walk = f"{book_slippage*100:.4f}%"
+            if result['book_filled'] < 1:
+                book_walk += f" (book depth exhausted, {result['book_filled']*100:.1f}% filled)"
+            order_size_ratio = result['order_size_ratio']
+            fees = result['fees']
+            order_value = result['order_value']
+            market_impact = result['market_impact']
+            liquidity = result['liquidity']
+            net_cost = result['net_cost']
+            maker_prob = result['maker_prob']
+            spread = result['spread']
 
             ui_start = time.perf_counter()
-             
-            
 
             # Update metrics display
             metrics['slippage'].metric(
                 "Estimated Slippage", 
                 f"{slippage*100:.2f}%",
-                delta=f"Model: Linear Regression | Size Ratio: {order_size_ratio:.4f}"
+                delta=f"Model: Linear Regression | P95 Tail: {result['slippage_quantiles'][0.95]*100:.2f}% | Book Walk: {book_walk} | Size Ratio: {order_size_ratio:.4f}"
             )
             
             metrics['fees'].metric(
                 "Transaction Fees", 
                 f"${fees:,.2f}",
-                delta=f"Taker Fee: {FEE_TIERS[fee_tier]['taker']*100:.2f}% | Value: ${order_value:,.2f}"
+                delta=f"Taker Fee: {result['fee_rate']*100:.2f}% | Value: ${order_value:,.2f}"
             )
             
             metrics['impact'].metric(
                 "Market Impact", 
                 f"${market_impact * order_value:,.2f}",
-                delta=f"Impact: {market_impact*100:.2f}% | Liquidity: {liquidity:.2f} BTC"
+                delta=f"Impact: {market_impact*100:.2f}% | Liquidity: {liquidity:.2f} {spot_asset.split('-')[0]} | σ: {result['volatility']*100:.2f}% ({result['volatility_source']})"
             )
             
             metrics['cost'].metric(
@@ -255,30 +427,48 @@ def main():
             metrics['maker_taker'].metric(
                 "Maker/Taker Probability", 
                 f"{maker_prob*100:.1f}% Maker",
-                delta=f"{100 - maker_prob*100:.1f}% Taker | Spread: {spread*100:.2f}%"
+                delta=f"{100 - maker_prob*100:.1f}% Taker | Spread: {spread*100:.2f}% | Microprice: {result['microstructure']['microprice']:,.2f}"
             )
 
             ui_end = time.perf_counter()
             ui_latency = (ui_end - ui_start) * 1000  # ms
-
-            loop_end = time.perf_counter()
-            loop_latency = (loop_end - loop_start) * 1000  # ms
             
             metrics['latency'].metric(
                 "System Latency", 
-                
-                f"{loop_latency:.1f} ms",
-                delta=f"Data: {data_latency:.1f} ms | Model: {model_latency:.1f} ms | UI: {ui_latency:.1f} ms"
+                f"{result.get('update_latency_ms', float('nan')):.2f} ms",
+                delta=f"Data: {result['data_latency_ms']:.2f} ms | Model: {result['model_latency_ms']:.2f} ms | UI: {ui_latency:.1f} ms"
             )
 
-            time.sleep(0.5)  # Update interval
-            
+            # Stage histograms and history change slowly; refresh them once a second
+            if time.time() - latency_refreshed > 1.0:
+                latency_table.table(pd.DataFrame(engine.latency.snapshot()).T)
+                cache_caption = "Cost cache: {hits} hits / {misses} misses ({hit_rate:.0%}), {size} entries".format(
+                    **engine.cache.stats()
+                )
+                if learner is not None:
+                    cache_caption += " | Online learning: {trades_seen} trades, {maker_taker_updates} maker/taker and {slippage_updates} slippage updates ({maker_taker_rejected} + {slippage_rejected} rejected)".format(
+                        **learner.stats
+                    )
+                cache_stats.caption(cache_caption)
+                times, values = engine.history.series(history_field, history_resolution, history_stat)
+                if len(times):
+                    history_chart.altair_chart(
+                        alt.Chart(pd.DataFrame({
+                            'time': pd.to_datetime(times, unit='ms'),
+                            'value': values
+                        })).mark_line().encode(
+                            x=alt.X('time:T', title=None),
+                            y=alt.Y('value:Q', title=history_labels[history_field], scale=alt.Scale(zero=False))
+                        ),
+                        use_container_width=True
+                    )
+                latency_refreshed = time.time()
 
         except Exception as e:
             st.error(f"⚠️ Simulation Error: {str(e)}")
             st.session_state.running = False
-            if st.session_state.client.running:
-                st.session_state.client.stop()
+            st.session_state.engine.stop()
+            feeds.release(st.session_state.symbol)
             break
 
 if __name__ == "__main__":
@@ -0,0 +1,7 @@
+from .synthetic import SyntheticFeed
+from .server import StandInServer
+
+__all__ = [
+    'SyntheticFeed',
+    'StandInServer'
+]
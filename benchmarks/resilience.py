@@ -0,0 +1,88 @@
+import argparse
+import threading
+import time
+from core.latency import LatencyRecorder
+from core.websocket_client import OKXWebSocketClient
+from .server import spawn
+
+SCENARIOS = ('drop', 'stall')
+
+
+def run_scenario(scenario, channel='books', every=500, rate=2_000.0, reconnects=3, timeout=60.0):
+    """
+    Stream from a stand-in that drops (or silently stalls) every connection
+    after ``every`` messages until the client has reconnected ``reconnects``
+    times. Reports how long each outage lasted from the client's point of
+    view and how much CPU the client burned meanwhile.
+    """
+    symbol = 'BTC-USDT'
+    option = 'drop_after' if scenario == 'drop' else 'stall_after'
+    server, url = spawn(channel, every * (reconnects + 2), rate, [symbol], **{option: every})
+
+    client = OKXWebSocketClient([symbol], channel=channel, latency=LatencyRecorder(), url=url)
+    # Short timers so a stall is noticed in about a second
+    client.heartbeat_interval = 0.5
+    client.pong_timeout = 0.5
+    client.reconnect_delay = (0.05, 1.0)
+
+    outages = []
+    seen = {'at': None, 'reconnects': 0}
+    recovered = threading.Event()
+
+    def on_update(symbol, book, ts):
+        now = time.perf_counter()
+        if client.reconnects != seen['reconnects']:
+            outages.append(now - seen['at'])
+            seen['reconnects'] = client.reconnects
+            if client.reconnects >= reconnects:
+                recovered.set()
+        seen['at'] = now
+
+    client.add_listener(on_update)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    client.start()
+    finished = recovered.wait(timeout)
+    # Let the recovered book settle before judging its state
+    time.sleep(0.2)
+    live = client.is_live(symbol)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    health = client.health
+    client.stop()
+    server.terminate()
+    server.join()
+
+    prefix = f'resilience[{scenario}]'
+    return {
+        f'{prefix}.completed': bool(finished),
+        f'{prefix}.live_after_recovery': live,
+        f'{prefix}.reconnects': health['reconnects'],
+        f'{prefix}.resyncs': health['resyncs'],
+        f'{prefix}.max_outage_ms': max(outages) * 1000 if outages else None,
+        f'{prefix}.mean_outage_ms': sum(outages) / len(outages) * 1000 if outages else None,
+        f'{prefix}.cpu_share': cpu / wall,
+        f'{prefix}.final_state': health['state']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconnect, heartbeat and resync checks against the stand-in server")
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument('--channel', default='books')
+    parser.add_argument('--every', type=int, default=500, help="Messages per connection before it fails")
+    parser.add_argument('--reconnects', type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for scenario in args.scenarios:
+        print(f"Running {scenario} scenario...")
+        results = run_scenario(scenario, args.channel, args.every, reconnects=args.reconnects)
+        for name, value in results.items():
+            shown = f"{value:,.3f}" if isinstance(value, float) else str(value)
+            print(f"  {name:<45} {shown}")
+        failed |= not (results[f'resilience[{scenario}].completed'] and results[f'resilience[{scenario}].live_after_recovery'])
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+import numpy as np
+from core.order_book import OrderBook
+from core.latency import LatencyRecorder
+from .synthetic import SyntheticFeed, CHANNEL_PROFILES
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+CHANNELS = tuple(CHANNEL_PROFILES)
+# Flag a metric when it moves this much in the wrong direction
+REGRESSION_THRESHOLD = 0.10
+
+
+def measure(fn, number, repeat=5):
+    """Best-of-``repeat`` nanoseconds per call over ``number`` calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        elapsed = (time.perf_counter_ns() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def populated_book(channel='books', count=2_000, seed=0):
+    book = OrderBook('BTC-USDT', validate=channel != 'books5')
+    for message in SyntheticFeed(channel=channel, seed=seed).messages(count):
+        book.update(message)
+    return book
+
+
+def bench_parse_and_update(channel, count, repeat=3):
+    encoded = SyntheticFeed(channel=channel).encoded(count)
+    messages = [json.loads(m) for m in encoded]
+    results = {}
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for m in encoded:
+            json.loads(m)
+        elapsed = (time.perf_counter_ns() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+    results[f'json.loads[{channel}].ns_per_msg'] = best
+
+    best = None
+    for _ in range(repeat):
+        book = OrderBook('BTC-USDT', validate=channel != 'books5')
+        start = time.perf_counter_ns()
+        for m in messages:
+            book.update(m)
+        elapsed = (time.perf_counter_ns() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+        if not book.valid:
+            raise RuntimeError(f"Synthetic {channel} stream failed validation")
+    results[f'order_book.update[{channel}].ns_per_msg'] = best
+    return results
+
+
+def bench_liquidity_depth(count):
+    """``get_liquidity_depth`` right after each update (cold) and repeated (cached)."""
+    book = OrderBook('BTC-USDT', validate=True)
+    cold = warm = 0
+    messages = list(SyntheticFeed(channel='books').messages(count))
+    for m in messages:
+        book.update(m)
+        start = time.perf_counter_ns()
+        book.get_liquidity_depth()
+        mid = time.perf_counter_ns()
+        book.get_liquidity_depth()
+        warm += time.perf_counter_ns() - mid
+        cold += mid - start
+    return {
+        'order_book.get_liquidity_depth.cold.ns_per_call': cold / count,
+        'order_book.get_liquidity_depth.warm.ns_per_call': warm / count
+    }
+
+
+def bench_models(models, number):
+    from core.engine import CostEngine
+
+    book = populated_book()
+    mid = book.mid_price
+    quantity = 1_000.0 / mid
+    liquidity = book.liquidity_depth
+    ratio = quantity / book.feature_depth
+    spread = book.spread
+    asks = book.side_arrays('asks')
+
+    class Feed:
+        def get_book(self, symbol):
+            return book
+
+    # No cache, so every call pays for features and inference
+    engine = CostEngine(Feed(), models, 'BTC-USDT', 1_000.0, cache_size=0, latency=LatencyRecorder())
+    calls = {
+        'slippage.predict_linear': lambda: models['slippage'].predict_linear(ratio, 0.02, spread),
+        'slippage.predict_quantiles': lambda: models['slippage'].predict_quantiles([ratio, 0.02, spread]),
+        'maker_taker.predict_probability': lambda: models['maker_taker'].predict_probability(quantity, spread),
+        'impact.calculate_impact': lambda: models['impact'].calculate_impact(quantity, 0.02, liquidity, mid),
+        'execution.walk': lambda: models['execution'].walk(asks, quantity),
+        'cost_engine.compute': lambda: engine.compute(book),
+    }
+    return {f'{name}.ns_per_call': measure(fn, number) for name, fn in calls.items()}
+
+
+def bench_history(count, points=600):
+    """Streaming bucket aggregation per result, and a full decimated chart series."""
+    from core.aggregator import StreamingAggregator
+    from core.engine import HISTORY_FIELDS
+
+    history = StreamingAggregator(HISTORY_FIELDS)
+    rng = np.random.default_rng(0)
+    # About ten results a second, long enough to fill every 1 s bucket
+    ts = 1_700_000_000_000 + np.cumsum(rng.integers(1, 200, count))
+    rows = [dict(zip(HISTORY_FIELDS, v)) for v in rng.normal(100.0, 1.0, (count, len(HISTORY_FIELDS))).tolist()]
+    start = time.perf_counter_ns()
+    for t, row in zip(ts.tolist(), rows):
+        history.update(t, row)
+    update = (time.perf_counter_ns() - start) / count
+    return {
+        'history.update.ns_per_call': update,
+        'history.series[1s].ns_per_call': measure(lambda: history.series('net_cost', 1_000, points=points), 10),
+        'history.series[1m].ns_per_call': measure(lambda: history.series('net_cost', 60_000, points=points), 10)
+    }
+
+
+def bench_monte_carlo(paths, workers=1):
+    """Cost distribution of a 10-slice schedule over synthetic and recorded paths."""
+    from models.monte_carlo import MonteCarloSimulator
+    from core.tick_buffer import TickBuffer
+
+    book = OrderBook('BTC-USDT', validate=True)
+    history = TickBuffer(20_000, 20)
+    for m in SyntheticFeed(channel='books').messages(20_000):
+        book.update(m)
+        history.append_book(book, int(m['data'][0]['ts']))
+    snapshots = history.latest().copy()
+    schedule = np.full(10, book.liquidity_depth / 100)
+    interval = (snapshots['ts'][-1] - snapshots['ts'][0]) / 1000 / 40
+
+    simulator = MonteCarloSimulator(paths, workers, seed=0)
+    # Warm the pool so process start-up isn't timed
+    simulator.simulate(book, schedule, interval, 0.02)
+    results = {
+        'monte_carlo.synthetic.ms_per_run': measure(lambda: simulator.simulate(book, schedule, interval, 0.02), 1, 3) / 1e6,
+        'monte_carlo.bootstrap.ms_per_run': measure(lambda: simulator.bootstrap(snapshots, schedule, interval), 1, 3) / 1e6
+    }
+    simulator.close()
+    return results
+
+
+def bench_end_to_end(channel, count, rate=None, models=None, timeout=120.0, processes=0):
+    """Stand-in server in its own process streaming into a real client (and engine)."""
+    from core.websocket_client import OKXWebSocketClient
+    from core.feed_process import ProcessFeedClient
+    from core.engine import CostEngine
+    from .server import spawn
+
+    symbol = 'BTC-USDT'
+    server, url = spawn(channel, count, rate, [symbol], timeout)
+
+    recorder = LatencyRecorder()
+    if processes:
+        client = ProcessFeedClient([symbol], channel=channel, shards=processes, latency=recorder, url=url)
+    else:
+        client = OKXWebSocketClient([symbol], channel=channel, latency=recorder, url=url)
+    engine = None
+    if models is not None:
+        engine = CostEngine(client, models, symbol, 1_000.0, latency=recorder)
+        results_seen = []
+        engine.subscribe(results_seen.append)
+        engine.start()
+
+    # (time, book version) per notification; worker processes coalesce
+    # notifications, so the version counts the messages actually applied
+    applied = []
+    done = threading.Event()
+
+    def on_update(symbol, book, ts):
+        applied.append((time.perf_counter(), book.version))
+        if book.version >= count:
+            done.set()
+
+    client.add_listener(on_update)
+    client.start()
+    finished = done.wait(timeout)
+    health = client.health
+    client.stop()
+    server.terminate()
+    if engine is not None:
+        engine.stop()
+    server.join()
+    if processes:
+        client.close()
+
+    elapsed = applied[-1][0] - applied[0][0] if len(applied) > 1 else 0.0
+    messages = applied[-1][1] - applied[0][1] if len(applied) > 1 else 0
+    prefix = f'e2e[{channel}]' if not processes else f'e2e[{channel},processes={processes}]'
+    results = {
+        f'{prefix}.applied': applied[-1][1] if applied else 0,
+        f'{prefix}.completed': bool(finished),
+        f'{prefix}.resyncs': health['resyncs'],
+        f'{prefix}.ticks_per_sec': messages / elapsed if elapsed else 0.0
+    }
+    if engine is not None:
+        results[f'{prefix}.engine_results'] = len(results_seen)
+    for stage, stats in recorder.snapshot().items():
+        # Synthetic exchange timestamps aren't wall-clock times
+        if stage == 'exchange_to_recv' or not stats['count']:
+            continue
+        for key in ('p50_ms', 'p99_ms', 'p999_ms'):
+            results[f'{prefix}.{stage}.{key}'] = stats[key]
+    return results
+
+
+def environment():
+    def git(*args):
+        try:
+            return subprocess.check_output(
+                ['git', *args], cwd=os.path.dirname(RESULTS_DIR), stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save(report, directory=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{report['environment']['commit'] or 'nogit'}.json"
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return path
+
+
+def latest_result(directory=RESULTS_DIR, exclude=None):
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(
+        os.path.join(directory, p) for p in os.listdir(directory)
+        if p.endswith('.json') and os.path.join(directory, p) != exclude
+    )
+    return paths[-1] if paths else None
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Rows of (metric, baseline, current, change, regressed) for shared numeric metrics."""
+    rows = []
+    for name, value in current['metrics'].items():
+        old = baseline['metrics'].get(name)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+        change = (value - old) / old
+        higher_is_better = name.endswith('per_sec')
+        regressed = change < -threshold if higher_is_better else change > threshold
+        rows.append((name, old, value, change, regressed))
+    return rows
+
+
+def print_metrics(metrics):
+    width = max(len(name) for name in metrics)
+    for name, value in metrics.items():
+        shown = f"{value:,.3f}" if isinstance(value, float) else str(value)
+        print(f"  {name:<{width}}  {shown}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed, book and model benchmarks")
+    parser.add_argument('--channels', nargs='+', default=list(CHANNELS), choices=CHANNELS)
+    parser.add_argument('--messages', type=int, default=20_000, help="Messages per micro-benchmark and e2e run")
+    parser.add_argument('--rate', type=float, help="E2E send rate in msgs/sec (default: as fast as possible)")
+    parser.add_argument('--calls', type=int, default=2_000, help="Calls per model micro-benchmark")
+    parser.add_argument('--paths', type=int, default=10_000, help="Monte Carlo paths per run")
+    parser.add_argument('--workers', type=int, default=1, help="Monte Carlo worker processes")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="Also run e2e with the feed in this many worker processes")
+    parser.add_argument('--skip-e2e', action='store_true')
+    parser.add_argument('--skip-models', action='store_true')
+    parser.add_argument('--no-save', action='store_true')
+    parser.add_argument('--compare', help="Baseline results file (default: the latest stored run)")
+    args = parser.parse_args()
+
+    models = None
+    if not args.skip_models:
+        from core.engine import load_models
+        try:
+            models = load_models()
+        except Exception as e:
+            print(f"Skipping model benchmarks, models failed to load: {e}")
+
+    metrics = {}
+    for channel in args.channels:
+        print(f"Parsing and applying {args.messages} {channel} messages...")
+        metrics.update(bench_parse_and_update(channel, args.messages))
+    print("Measuring liquidity depth...")
+    metrics.update(bench_liquidity_depth(min(args.messages, 5_000)))
+    print("Aggregating history...")
+    metrics.update(bench_history(max(args.messages, 50_000)))
+    print(f"Simulating {args.paths} Monte Carlo paths...")
+    metrics.update(bench_monte_carlo(args.paths, args.workers))
+    if models is not None:
+        print("Measuring model inference...")
+        metrics.update(bench_models(models, args.calls))
+    if not args.skip_e2e:
+        for channel in args.channels:
+            print(f"Streaming {args.messages} {channel} messages end to end...")
+            metrics.update(bench_end_to_end(channel, args.messages, args.rate, models))
+            if args.processes:
+                print(f"Streaming {args.messages} {channel} messages through {args.processes} feed process(es)...")
+                metrics.update(bench_end_to_end(channel, args.messages, args.rate, models, processes=args.processes))
+
+    report = {'environment': environment(), 'arguments': vars(args), 'metrics': metrics}
+    print_metrics(metrics)
+
+    path = None if args.no_save else save(report)
+    if path:
+        print(f"Saved results to {path}")
+
+    baseline_path = args.compare or latest_result(exclude=path)
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline_path} ({baseline['environment'].get('commit')}):")
+        regressions = 0
+        for name, old, new, change, regressed in compare(report, baseline):
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {name:<60} {old:>14,.3f} -> {new:>14,.3f}  {change:+7.1%}{flag}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
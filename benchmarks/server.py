@@ -0,0 +1,152 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+import websockets
+from .synthetic import SyntheticFeed
+
+
+class StandInServer:
+    """
+    Local websocket server that speaks enough of the OKX public API for the
+    client: it acknowledges subscribe/unsubscribe ops and streams synthetic
+    book messages for each subscribed instrument at ``rate`` messages/sec
+    (``None`` sends as fast as the socket accepts them).
+
+    Messages are generated and encoded before streaming starts so the
+    generator never throttles the feed. Every (re)subscribe starts with a
+    fresh snapshot, so client resyncs behave as they do against OKX.
+
+    For connection-handling checks, ``drop_after`` aborts each connection
+    after that many book messages, and ``stall_after`` stops sending (and
+    stops answering ``ping``) while keeping the socket open.
+    """
+
+    def __init__(self, channel='books', count=10_000, rate=None, host='127.0.0.1', port=0, seed=0,
+                 drop_after=None, stall_after=None):
+        self.channel = channel
+        self.count = count
+        self.rate = rate
+        self.drop_after = drop_after
+        self.stall_after = stall_after
+        self.host = host
+        self.port = port
+        self.seed = seed
+        self.sent = 0
+        self.connections = 0
+        self._messages = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def _encoded(self, symbol):
+        if symbol not in self._messages:
+            feed = SyntheticFeed(symbol, self.channel, seed=self.seed)
+            self._messages[symbol] = feed.encoded(self.count)
+        return self._messages[symbol]
+
+    def prepare(self, symbols):
+        for symbol in symbols:
+            self._encoded(symbol)
+
+    async def _stream(self, ws, symbol, session):
+        # Incremental channels can only resume from the snapshot, so each
+        # subscription replays the prepared sequence from the start
+        messages = self._encoded(symbol)
+        start = time.perf_counter()
+        for i, message in enumerate(messages):
+            if self.rate:
+                delay = start + i / self.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 256 == 0:
+                await asyncio.sleep(0)
+            await ws.send(message)
+            self.sent += 1
+            session['sent'] += 1
+            if self.drop_after and session['sent'] >= self.drop_after:
+                # No close handshake, like a dropped network path
+                ws.transport.abort()
+                return
+            if self.stall_after and session['sent'] >= self.stall_after:
+                session['stalled'] = True
+                return
+
+    async def _handler(self, ws, path=None):
+        self.connections += 1
+        streams = {}
+        session = {'sent': 0, 'stalled': False}
+        try:
+            async for raw in ws:
+                if raw == 'ping':
+                    if not session['stalled']:
+                        await ws.send('pong')
+                    continue
+                request = json.loads(raw)
+                op = request.get('op')
+                for arg in request.get('args', []):
+                    symbol = arg.get('instId')
+                    await ws.send(json.dumps({'event': op, 'arg': arg}))
+                    task = streams.pop(symbol, None)
+                    if task is not None:
+                        task.cancel()
+                    if op == 'subscribe':
+                        streams[symbol] = asyncio.ensure_future(self._stream(ws, symbol, session))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in streams.values():
+                task.cancel()
+
+    async def _serve(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_queue=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        await self._server.wait_closed()
+
+    def start(self):
+        """Serve from a background thread; returns once the port is bound."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._serve(),), daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        return self.url
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def stop(self):
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        self.join()
+
+
+def serve(channel, count, rate, port, symbols, ready=None, **options):
+    """Process entry point: prepare the feed, bind ``port`` and serve forever."""
+    server = StandInServer(channel, count, rate, port=port, **options)
+    server.prepare(symbols)
+    server.start()
+    if ready is not None:
+        ready.put(server.port)
+    server.join()
+
+
+def spawn(channel, count, rate=None, symbols=('BTC-USDT',), timeout=120.0, **options):
+    """Run a stand-in in its own process so it doesn't share the client's GIL; returns (process, url)."""
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(
+        target=serve, args=(channel, count, rate, 0, list(symbols), ready), kwargs=options, daemon=True
+    )
+    process.start()
+    port = ready.get(timeout=timeout)
+    return process, f"ws://127.0.0.1:{port}"
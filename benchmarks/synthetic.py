@@ -0,0 +1,154 @@
+import json
+import numpy as np
+from core.order_book import OrderBook
+from core.price_ladder import PriceLadder
+
+# Typical push interval (ms) and changed levels per message for each channel
+CHANNEL_PROFILES = {
+    'books5': {'interval_ms': 100, 'changes': 4},
+    'books': {'interval_ms': 100, 'changes': 12},
+    'books-l2-tbt': {'interval_ms': 10, 'changes': 2},
+}
+SNAPSHOT_DEPTH = 400
+
+
+class SyntheticFeed:
+    """
+    Generates OKX book messages for one instrument with realistic level churn:
+    most changes land near the touch, levels are added, resized and pulled,
+    and the touch occasionally gets taken out so the mid walks.
+
+    Incremental channels carry seqId/prevSeqId and a checksum, so they pass
+    the same validation as the live feed.
+    """
+
+    def __init__(self, symbol='BTC-USDT', channel='books', mid=30_000.0, tick_size=0.1,
+                 lot_size=0.0001, depth=SNAPSHOT_DEPTH, seed=0, start_ms=1_700_000_000_000):
+        if channel not in CHANNEL_PROFILES:
+            raise ValueError(f"Unsupported channel: {channel}")
+        self.symbol = symbol
+        self.channel = channel
+        self.profile = CHANNEL_PROFILES[channel]
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.depth = depth
+        self.ts = start_ms
+        self.seq_id = 1
+        self.rng = np.random.default_rng(seed)
+        self._price_decimals = max(0, -int(np.floor(np.log10(tick_size))))
+        self._size_decimals = max(0, -int(np.floor(np.log10(lot_size))))
+        # Levels are kept in integer ticks -> integer lots
+        center = int(round(mid / tick_size))
+        self.bids = PriceLadder(descending=True)
+        self.asks = PriceLadder()
+        for i in range(depth):
+            self.bids.set(center - 1 - i, self._size())
+            self.asks.set(center + 1 + i, self._size())
+        # Mirror book used to stamp checksums on incremental messages
+        self._mirror = OrderBook(symbol, validate=True)
+
+    def _size(self):
+        return max(1, int(self.rng.lognormal(3.0, 1.2)))
+
+    def _level(self, price, lots):
+        return [
+            f"{price * self.tick_size:.{self._price_decimals}f}",
+            f"{lots * self.lot_size:.{self._size_decimals}f}",
+            "0",
+            str(int(self.rng.integers(1, 8)))
+        ]
+
+    def _offset(self):
+        # Most activity sits within a few ticks of the touch
+        return int(self.rng.geometric(0.2)) - 1
+
+    def _churn(self, changes):
+        bids, asks = self.bids, self.asks
+        changed_bids, changed_asks = {}, {}
+        for _ in range(changes):
+            is_bid = self.rng.random() < 0.5
+            side, other, changed = (bids, asks, changed_bids) if is_bid else (asks, bids, changed_asks)
+            sign = -1 if is_bid else 1
+            best = side.best
+            opposite = other.best
+            roll = self.rng.random()
+            if roll < 0.05 and len(side) > 1:
+                # Touch taken out by a trade
+                side.remove(best)
+                changed[best] = 0
+            elif roll < 0.55:
+                price = best + sign * self._offset()
+                if price in side:
+                    changed[price] = self._size()
+                    side.set(price, changed[price])
+            elif roll < 0.8:
+                if self.rng.random() < 0.5:
+                    # Improve the touch by a tick
+                    price = best - sign
+                else:
+                    # New level in the nearest gap behind the touch
+                    price = best + sign * self._offset()
+                    while price in side:
+                        price += sign
+                if (is_bid and price < opposite) or (not is_bid and price > opposite):
+                    changed[price] = self._size()
+                    side.set(price, changed[price])
+            else:
+                price = best + sign * (self._offset() + 1)
+                if price in side:
+                    side.remove(price)
+                    changed[price] = 0
+        for side, changed in ((bids, changed_bids), (asks, changed_asks)):
+            if len(side) > self.depth:
+                for worst in side.prices()[self.depth:]:
+                    side.remove(worst)
+                    changed[worst] = 0
+        return changed_bids, changed_asks
+
+    def _book_levels(self, side, n=None):
+        return [self._level(p, side[p]) for p in side.prices(n)]
+
+    def _message(self, action, bids, asks):
+        body = {'asks': asks, 'bids': bids, 'ts': str(self.ts)}
+        message = {'arg': {'channel': self.channel, 'instId': self.symbol}}
+        if self.channel == 'books5':
+            body['instId'] = self.symbol
+            body['seqId'] = self.seq_id
+        else:
+            message['action'] = action
+            body['prevSeqId'] = -1 if action == 'snapshot' else self.seq_id - 1
+            body['seqId'] = self.seq_id
+            self._mirror.update({**message, 'data': [body]})
+            body['checksum'] = self._mirror.checksum()
+        message['data'] = [body]
+        self.seq_id += 1
+        return message
+
+    def snapshot(self):
+        n = 5 if self.channel == 'books5' else None
+        return self._message(
+            'snapshot',
+            self._book_levels(self.bids, n),
+            self._book_levels(self.asks, n)
+        )
+
+    def update(self):
+        self.ts += int(self.rng.exponential(self.profile['interval_ms'])) + 1
+        changes = 1 + int(self.rng.poisson(self.profile['changes'] - 1))
+        changed_bids, changed_asks = self._churn(changes)
+        if self.channel == 'books5':
+            return self.snapshot()
+        return self._message(
+            'update',
+            [self._level(p, q) for p, q in sorted(changed_bids.items(), reverse=True)],
+            [self._level(p, q) for p, q in sorted(changed_asks.items())]
+        )
+
+    def messages(self, count):
+        """A snapshot followed by ``count - 1`` updates."""
+        yield self.snapshot()
+        for _ in range(count - 1):
+            yield self.update()
+
+    def encoded(self, count):
+        return [json.dumps(m, separators=(',', ':')) for m in self.messages(count)]
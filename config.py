@@ -3,4 +3,84 @@ SYMBOL = "BTC-USDT"
 FEE_TIERS = {
     'tier1': {'maker': 0.0002, 'taker': 0.0005},
     'tier2': {'maker': 0.0001, 'taker': 0.0004}
-}
\ No newline at end of file
+}
+
+# Book channel: "books5" pushes full top-5 snapshots; "books" / "books-l2-tbt"
+# push a snapshot followed by checksummed, sequenced incremental updates.
+BOOK_CHANNEL = "books5"
+
+
+# Tick history kept in memory per symbol: rows, ladder levels per side, and
+# what to do when full ("overwrite" oldest, or "drop" new rows and count them)
+TICK_CAPACITY = 10_000
+TICK_LEVELS = 5
+TICK_OVERFLOW = "overwrite"
+
+
+# Root directory for recorded book segments (<dir>/<symbol>/<YYYYmmdd-HH>.bin)
+RECORDING_DIR = "recordings"
+
+
+# Model features measure book depth within this fraction of mid on either
+# side (0.1%); training and live pricing both read it. The wider
+# ``liquidity_depth`` (10%) feeds the impact model and the dashboard.
+FEATURE_DEPTH_BAND = 0.001
+
+
+# Local port for the Prometheus latency endpoint (/metrics)
+METRICS_PORT = 9108
+
+
+# Store book prices as integer ticks and sizes as integer lots (instrument
+# tick/lot sizes are fetched once per symbol from the OKX REST API)
+FIXED_POINT = False
+
+
+# Feed health: send OKX's "ping" after this many idle seconds and reconnect
+# if no "pong" (or any message) follows within the timeout; reconnect delays
+# back off exponentially from the min to the max (seconds) with equal jitter,
+# waiting a random half to all of the current step.
+# A subscribed book with no update for BOOK_STALE_AFTER seconds reports stale.
+HEARTBEAT_INTERVAL = 15.0
+PONG_TIMEOUT = 5.0
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+BOOK_STALE_AFTER = 30.0
+
+
+# Run feed parsing and book maintenance in this many worker processes
+# (0 keeps it on a thread in the app process). Workers publish each book's
+# top SHARED_BOOK_LEVELS levels to a shared-memory table of
+# SHARED_BOOK_CAPACITY symbol slots.
+FEED_PROCESSES = 0
+SHARED_BOOK_CAPACITY = 64
+SHARED_BOOK_LEVELS = 50
+
+
+# Monte Carlo execution simulator: default path count, worker processes
+# (0 uses one per CPU, 1 runs in-process) and paths per task, so results
+# for a given seed don't depend on the worker count.
+MONTE_CARLO_PATHS = 10_000
+MONTE_CARLO_WORKERS = 0
+MONTE_CARLO_CHUNK = 2_500
+
+
+# Dashboard history: each metric is rolled into OHLC + mean buckets at these
+# resolutions (ms), keeping the last HISTORY_BUCKETS of each (1 h of 1 s,
+# 10 h of 10 s, 2.5 days of 1 min); charts are decimated to HISTORY_POINTS.
+HISTORY_RESOLUTIONS = (1_000, 10_000, 60_000)
+HISTORY_BUCKETS = 3_600
+HISTORY_POINTS = 600
+
+
+# Also subscribe to the trades channel and keep each symbol's recent trades,
+# joined to the book at trade time, in a columnar buffer of TRADE_CAPACITY
+# rows. ONLINE_LEARNING turns trade ingestion on and keeps refitting the
+# maker/taker and linear slippage models from live trades in mini-batches of
+# at least ONLINE_BATCH trades, checked every ONLINE_INTERVAL seconds.
+TRADE_CHANNEL = "trades"
+INGEST_TRADES = False
+TRADE_CAPACITY = 50_000
+ONLINE_LEARNING = False
+ONLINE_BATCH = 256
+ONLINE_INTERVAL = 5.0
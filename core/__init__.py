@@ -1,7 +1,40 @@
 from .websocket_client import OKXWebSocketClient
 from .order_book import OrderBook
+from .price_ladder import PriceLadder
+from .fixed_point import FixedPoint
+from .ring_buffer import RingBuffer
+from .tick_buffer import TickBuffer
+from .trade_buffer import TradeBuffer
+from .engine import CostEngine
+from .cache import LRUCache
+from .aggregator import StreamingAggregator, lttb
+from .latency import LatencyHistogram, LatencyRecorder
+from .estimators import MicrostructureStats
+from .shared_book import SharedBookTable, SharedOrderBook
+from .feed_process import ProcessFeedClient
+from .registry import FeedRegistry, ModelRegistry, get_feeds, get_models, get_learner
 
 __all__ = [
     'OKXWebSocketClient',
-    'OrderBook'
+    'OrderBook',
+    'PriceLadder',
+    'FixedPoint',
+    'RingBuffer',
+    'TickBuffer',
+    'TradeBuffer',
+    'CostEngine',
+    'LRUCache',
+    'StreamingAggregator',
+    'lttb',
+    'LatencyHistogram',
+    'LatencyRecorder',
+    'MicrostructureStats',
+    'SharedBookTable',
+    'SharedOrderBook',
+    'ProcessFeedClient',
+    'FeedRegistry',
+    'ModelRegistry',
+    'get_feeds',
+    'get_models',
+    'get_learner'
 ]
\ No newline at end of file
@@ -0,0 +1,156 @@
+import threading
+import numpy as np
+from .ring_buffer import RingBuffer
+from config import HISTORY_RESOLUTIONS, HISTORY_BUCKETS, HISTORY_POINTS
+
+STATS = ('open', 'high', 'low', 'close', 'mean')
+
+
+def bucket_dtype(fields):
+    n = len(fields)
+    return np.dtype([
+        ('start', 'i8'),           # bucket start, ms
+        ('open', 'f8', (n,)),
+        ('high', 'f8', (n,)),
+        ('low', 'f8', (n,)),
+        ('close', 'f8', (n,)),
+        ('sum', 'f8', (n,)),
+        ('count', 'i8'),
+    ])
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a series to ``threshold``
+    points. Keeps the first and last points and, per bucket, the point that
+    makes the largest triangle with the previous pick and the next bucket's
+    average, so spikes survive decimation.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Average of each following bucket doesn't depend on earlier picks
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.r_[sums_x / counts, x[-1]]
+    avg_y = np.r_[sums_y / counts, y[-1]]
+
+    picks = np.empty(threshold, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return x[picks], y[picks]
+
+
+class BucketRing(RingBuffer):
+    """Closed time buckets at one resolution, plus the bucket still filling."""
+
+    def __init__(self, fields, resolution_ms, capacity):
+        super().__init__(bucket_dtype(fields), capacity)
+        self.resolution = resolution_ms
+        # The open bucket lives in plain arrays; structured field access is
+        # several times slower on the per-update path
+        n = len(fields)
+        self._start = -1
+        self._count = 0
+        self._open = np.zeros(n)
+        self._high = np.zeros(n)
+        self._low = np.zeros(n)
+        self._close = np.zeros(n)
+        self._sum = np.zeros(n)
+
+    def add(self, ts, values):
+        start = ts - ts % self.resolution
+        if start != self._start:
+            if self._count:
+                self.append(self._current())
+            self._start = start
+            self._count = 0
+            self._open[:] = values
+            self._high[:] = values
+            self._low[:] = values
+            self._sum[:] = 0.0
+        else:
+            np.maximum(self._high, values, out=self._high)
+            np.minimum(self._low, values, out=self._low)
+        self._close[:] = values
+        self._sum += values
+        self._count += 1
+
+    def _current(self):
+        return (self._start, self._open, self._high, self._low, self._close, self._sum, self._count)
+
+    def rows(self):
+        """Closed buckets oldest first, then the open one."""
+        if not self._count:
+            return self.latest().copy()
+        return np.concatenate([self.latest(), np.array([self._current()], dtype=self.dtype)])
+
+    def clear(self):
+        super().clear()
+        self._start = -1
+        self._count = 0
+
+
+class StreamingAggregator:
+    """
+    Rolls a stream of metric values into OHLC + mean buckets at several
+    resolutions, each in a fixed ring, so memory is bounded however long
+    the session runs. Chart series come back decimated with LTTB.
+    """
+
+    def __init__(self, fields, resolutions=HISTORY_RESOLUTIONS, capacity=HISTORY_BUCKETS):
+        self.fields = tuple(fields)
+        self._index = {field: i for i, field in enumerate(self.fields)}
+        self.rings = {r: BucketRing(self.fields, r, capacity) for r in resolutions}
+        self.lock = threading.Lock()
+
+    @property
+    def resolutions(self):
+        return tuple(self.rings)
+
+    def update(self, ts, values):
+        """Add one observation at ``ts`` (ms); ``values`` is a mapping with every field."""
+        row = np.array([values[f] for f in self.fields], dtype=float)
+        ts = int(ts)
+        with self.lock:
+            for ring in self.rings.values():
+                ring.add(ts, row)
+
+    def clear(self):
+        with self.lock:
+            for ring in self.rings.values():
+                ring.clear()
+
+    def buckets(self, resolution):
+        with self.lock:
+            return self.rings[resolution].rows()
+
+    def ohlc(self, field, resolution):
+        """Start times (ms) and open/high/low/close/mean arrays for one field."""
+        rows = self.buckets(resolution)
+        i = self._index[field]
+        return {
+            'start': rows['start'],
+            'open': rows['open'][:, i],
+            'high': rows['high'][:, i],
+            'low': rows['low'][:, i],
+            'close': rows['close'][:, i],
+            'mean': rows['sum'][:, i] / np.maximum(rows['count'], 1)
+        }
+
+    def series(self, field, resolution, stat='close', points=HISTORY_POINTS):
+        """(start ms, value) of ``stat`` for ``field``, decimated to at most ``points``."""
+        if stat not in STATS:
+            raise ValueError(f"Unknown statistic: {stat}")
+        bars = self.ohlc(field, resolution)
+        return lttb(bars['start'], bars[stat], points)
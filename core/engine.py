@@ -0,0 +1,356 @@
+import argparse
+import threading
+import time
+import numpy as np
+from queue import Queue, Empty, Full
+from config import FEE_TIERS, SYMBOL, METRICS_PORT, FEED_PROCESSES
+from .latency import latency as default_latency, serve_metrics
+from .cache import LRUCache
+from .aggregator import StreamingAggregator
+
+
+# Result fields rolled into the dashboard's history buckets
+HISTORY_FIELDS = ('mid_price', 'spread', 'liquidity', 'net_cost', 'slippage', 'market_impact')
+
+
+def load_models():
+    from models.slippage import SlippageModel
+    from models.maker_taker import MakerTakerPredictor
+    from models.market_impact import MarketImpactCalculator
+    from models.execution import ExecutionEngine
+
+    slippage_model = SlippageModel()
+    slippage_model.load()
+    maker_taker_model = MakerTakerPredictor()
+    maker_taker_model.load()
+    impact_model = MarketImpactCalculator()
+    impact_model.load()
+    return {
+        'slippage': slippage_model,
+        'maker_taker': maker_taker_model,
+        'impact': impact_model,
+        'execution': ExecutionEngine()
+    }
+
+
+class CostEngine:
+    """
+    Recomputes trade costs whenever the feed applies a book update and
+    publishes each result to registered callbacks and queues.
+
+    Updates are coalesced: a burst of book messages wakes the worker once and
+    it prices the latest book, so it never queues stale work behind the feed.
+    """
+
+    def __init__(self, client, models, symbol=SYMBOL, quantity_usd=100.0,
+                 volatility=0.02, fee_tier='tier1', latency=None, live_volatility=True,
+                 cache_size=256, registry=None):
+        self.client = client
+        # Hot reloads bump the registry version, so cached prices from the old
+        # models are never served
+        self.registry = registry
+        self.latency = latency or default_latency
+        self.models = models
+        self.symbol = symbol
+        self.quantity_usd = quantity_usd
+        self.volatility = volatility
+        self.fee_tier = fee_tier
+        # Price with the book's measured volatility once it has warmed up;
+        # ``volatility`` stays as the manual override and warm-up fallback
+        self.live_volatility = live_volatility
+        self.cache = LRUCache(cache_size)
+        self.history = StreamingAggregator(HISTORY_FIELDS)
+        self.latest = None
+        self.running = False
+        self.thread = None
+        self._wake = threading.Event()
+        # Why the worker was woken: a book update is a latency sample, a
+        # configure() call only reprices. Stamps are written together with
+        # the wake under ``_wake_lock`` so the worker never takes one without
+        # the other.
+        self._wake_lock = threading.Lock()
+        self._updated_at = None
+        self._configured_at = None
+        self._subscribers = []
+        self._queues = []
+
+    # --- pub/sub ---
+
+    def subscribe(self, callback):
+        """Call ``callback(result)`` on the engine thread for every new result."""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def listen(self, maxsize=1):
+        """Queue of results for a polling consumer; keeps only the newest ``maxsize``."""
+        queue = Queue(maxsize=maxsize)
+        self._queues.append(queue)
+        return queue
+
+    def unlisten(self, queue):
+        if queue in self._queues:
+            self._queues.remove(queue)
+
+    def _publish(self, result):
+        self.latest = result
+        for callback in list(self._subscribers):
+            callback(result)
+        for queue in list(self._queues):
+            while True:
+                try:
+                    queue.put_nowait(result)
+                    break
+                except Full:
+                    try:
+                        queue.get_nowait()
+                    except Empty:
+                        pass
+
+    # --- inputs ---
+
+    def configure(self, symbol=None, quantity_usd=None, volatility=None, fee_tier=None,
+                  live_volatility=None):
+        changed = False
+        for name, value in (('symbol', symbol), ('quantity_usd', quantity_usd),
+                            ('volatility', volatility), ('fee_tier', fee_tier),
+                            ('live_volatility', live_volatility)):
+            if value is not None and getattr(self, name) != value:
+                if name == 'symbol':
+                    self.history.clear()
+                    self.cache.clear()
+                setattr(self, name, value)
+                changed = True
+        if changed:
+            with self._wake_lock:
+                self._configured_at = time.perf_counter()
+                self._wake.set()
+
+    def volatility_for(self, order_book):
+        """(volatility, source) the engine prices ``order_book`` with; caller holds its lock."""
+        stats = order_book.stats
+        if self.live_volatility and stats.ready:
+            return stats.volatility(), 'live'
+        return self.volatility, 'manual'
+
+    def _on_book_update(self, symbol, order_book, ts):
+        if symbol == self.symbol:
+            with self._wake_lock:
+                self._updated_at = time.perf_counter()
+                self._wake.set()
+
+    # --- computation ---
+
+    def _model_state(self):
+        return (
+            self.registry.version if self.registry is not None else 0,
+            # Online updates swap coefficients in; reprice without a new book
+            getattr(self.models['slippage'], 'generation', 0),
+            getattr(self.models['maker_taker'], 'generation', 0)
+        )
+
+    def _cache_key(self, order_book):
+        # Inputs are quantized so float noise from the UI doesn't defeat the cache
+        return (
+            order_book.symbol,
+            order_book.epoch,
+            order_book.version,
+            round(self.quantity_usd, 2),
+            round(self.volatility, 6),
+            self.fee_tier,
+            self.live_volatility
+        ) + self._model_state()
+
+    def compute(self, order_book, updated_at=None):
+        from data.features import live_features
+
+        data_start = time.perf_counter()
+        with order_book.lock:
+            key = self._cache_key(order_book)
+            # Invalid books are waiting for a snapshot; their levels are stale
+            if not order_book.valid:
+                return None
+            cached = self.cache.get(key)
+            if cached is not None:
+                # Report this call's cost, not the one that filled the cache
+                data_latency = (time.perf_counter() - data_start) * 1000
+                return dict(cached, cached=True, data_latency_ms=data_latency, model_latency_ms=0.0)
+            mid_price = order_book.mid_price
+            if not mid_price:
+                return None
+            liquidity = order_book.liquidity_depth
+            ask_levels = order_book.side_arrays('asks')
+            volatility, volatility_source = self.volatility_for(order_book)
+            microstructure = order_book.stats.snapshot()
+            # Convert USD to asset quantity using current mid price
+            quantity = self.quantity_usd / mid_price
+            # The models' inputs, defined as in training
+            features = live_features(order_book, quantity, volatility)
+
+        spread = features['spread']
+        depth = features['depth']
+        order_size_ratio = features['order_size_ratio']
+
+        model_start = time.perf_counter()
+        data_latency = (model_start - data_start) * 1000  # ms
+        if updated_at is not None:
+            self.latency.record('applied_to_features', (model_start - updated_at) * 1e9)
+        models = self.models
+        slippage = models['slippage'].predict_linear(order_size_ratio, volatility, spread)
+        slippage_quantiles = {
+            q: float(v[0]) for q, v in
+            models['slippage'].predict_quantiles([order_size_ratio, volatility, spread]).items()
+        }
+        walk = models['execution'].walk(ask_levels, quantity)
+        book_slippage = float(walk['slippage'][0])
+        # Share of the order the visible ladder can fill; below 1 the walk's
+        # slippage only covers the filled part
+        book_filled = float(walk['filled'][0]) / quantity if quantity > 0 else 1.0
+        maker_prob = models['maker_taker'].predict_probability(quantity, spread)
+
+        order_value = quantity * mid_price
+        fee_rate = FEE_TIERS[self.fee_tier]['taker']
+        fees = order_value * fee_rate
+        market_impact = models['impact'].calculate_impact(quantity, volatility, liquidity, mid_price)
+        net_cost = order_value + fees + (slippage * order_value) + (market_impact * order_value)
+        model_end = time.perf_counter()
+        model_latency = (model_end - model_start) * 1000  # ms
+        self.latency.record('features_to_model', (model_end - model_start) * 1e9)
+
+        result = {
+            'symbol': self.symbol,
+            'book_version': key[2],
+            'mid_price': mid_price,
+            'spread': spread,
+            'liquidity': liquidity,
+            'feature_depth': depth,
+            'quantity': quantity,
+            'order_size_ratio': order_size_ratio,
+            'order_value': order_value,
+            'fee_rate': fee_rate,
+            'fees': fees,
+            'slippage': slippage,
+            'slippage_quantiles': slippage_quantiles,
+            'book_slippage': book_slippage,
+            'book_filled': book_filled,
+            'market_impact': market_impact,
+            'maker_prob': maker_prob,
+            'net_cost': net_cost,
+            'volatility': volatility,
+            'volatility_source': volatility_source,
+            'microstructure': microstructure,
+            'data_latency_ms': data_latency,
+            'model_latency_ms': model_latency
+        }
+        self.cache.put(key, result)
+        return dict(result, cached=False)
+
+    def cost_surface(self, sizes_usd, volatilities, fee_tiers=None):
+        """Scenario grid for the engine's symbol, memoized per book version and grid."""
+        from models.scenario import cost_surface
+
+        order_book = self.client.get_book(self.symbol)
+        if order_book is None:
+            raise ValueError(f"No book for {self.symbol}")
+        sizes_usd = np.round(np.asarray(sizes_usd, dtype=float), 2)
+        volatilities = np.round(np.asarray(volatilities, dtype=float), 6)
+        fee_tiers = tuple(fee_tiers or FEE_TIERS)
+        key = (
+            'surface', order_book.symbol, order_book.epoch, order_book.version,
+            sizes_usd.tobytes(), volatilities.tobytes(), fee_tiers
+        ) + self._model_state()
+        return self.cache.get_or_compute(
+            key, lambda: cost_surface(order_book, self.models, sizes_usd, volatilities, fee_tiers)
+        )
+
+    def _run(self):
+        while self.running:
+            if not self._wake.wait(timeout=0.5):
+                continue
+            with self._wake_lock:
+                self._wake.clear()
+                updated_at, self._updated_at = self._updated_at, None
+                configured_at, self._configured_at = self._configured_at, None
+            woken_at = updated_at if updated_at is not None else configured_at
+            # stop() wakes the worker without asking for a price
+            if woken_at is None:
+                continue
+            order_book = self.client.get_book(self.symbol)
+            if order_book is None:
+                continue
+            try:
+                result = self.compute(order_book, updated_at)
+            except Exception as e:
+                print(f"Cost engine error: {e}")
+                continue
+            if result is None:
+                continue
+            publish_start = time.perf_counter()
+            result['update_latency_ms'] = (publish_start - woken_at) * 1000
+            self.history.update(time.time() * 1000, result)
+            self._publish(result)
+            self.latency.record('model_to_published', (time.perf_counter() - publish_start) * 1e9)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.client.add_listener(self._on_book_update)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.client.remove_listener(self._on_book_update)
+        self._wake.set()
+        if self.thread:
+            self.thread.join()
+
+
+def main():
+    from .websocket_client import OKXWebSocketClient
+    from .feed_process import ProcessFeedClient
+
+    parser = argparse.ArgumentParser(description="Headless trade cost engine")
+    parser.add_argument('--symbol', default=SYMBOL)
+    parser.add_argument('--quantity', type=float, default=100.0, help="Order size in USD")
+    parser.add_argument('--volatility', type=float, default=0.02)
+    parser.add_argument('--fee-tier', default='tier1', choices=list(FEE_TIERS))
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help="Serve Prometheus metrics on this port (0 disables)")
+    parser.add_argument('--processes', type=int, default=FEED_PROCESSES,
+                        help="Run the feed in this many worker processes (0 keeps it in-process)")
+    args = parser.parse_args()
+
+    if args.processes:
+        client = ProcessFeedClient([args.symbol], shards=args.processes)
+    else:
+        client = OKXWebSocketClient([args.symbol])
+    engine = CostEngine(client, load_models(), args.symbol, args.quantity,
+                        args.volatility, args.fee_tier)
+    engine.subscribe(lambda r: print(
+        f"{r['symbol']} mid={r['mid_price']:.2f} cost=${r['net_cost']:,.2f} "
+        f"slippage={r['slippage']*100:.4f}% impact={r['market_impact']*100:.4f}% "
+        f"latency={r.get('update_latency_ms', float('nan')):.3f}ms"
+    ))
+    if args.metrics_port:
+        serve_metrics(engine.latency, port=args.metrics_port)
+    engine.start()
+    client.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop()
+        engine.stop()
+        if args.processes:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import math
+from collections import deque
+
+# Volatilities are reported on a daily horizon, like the dashboard's input
+DAILY_SECONDS = 86_400
+
+
+class EWMA:
+    """Time-decayed mean; ``halflife`` in seconds."""
+
+    def __init__(self, halflife):
+        self.halflife = halflife
+        self.value = None
+        self._last_ts = None
+
+    def update(self, ts_ms, x):
+        if self.value is None:
+            self.value = x
+        else:
+            dt = max(ts_ms - self._last_ts, 0) / 1000
+            alpha = math.exp(-dt * math.log(2) / self.halflife)
+            self.value = alpha * self.value + (1 - alpha) * x
+        self._last_ts = ts_ms
+        return self.value
+
+
+class EWMAVolatility:
+    """EWMA of per-second variance of mid log-returns."""
+
+    def __init__(self, halflife=60.0):
+        self.halflife = halflife
+        self.variance = 0.0
+        self.count = 0
+        self._last_ts = None
+        self._last_mid = None
+
+    def update(self, ts_ms, mid):
+        if self._last_mid is not None and ts_ms > self._last_ts:
+            dt = (ts_ms - self._last_ts) / 1000
+            r = math.log(mid / self._last_mid)
+            alpha = math.exp(-dt * math.log(2) / self.halflife)
+            self.variance = alpha * self.variance + (1 - alpha) * (r * r / dt)
+            self.count += 1
+        # Same-timestamp updates fold into the next return instead of dt == 0
+        if self._last_ts is None or ts_ms > self._last_ts:
+            self._last_ts = ts_ms
+            self._last_mid = mid
+
+    def volatility(self, horizon=DAILY_SECONDS):
+        return math.sqrt(self.variance * horizon)
+
+
+class RollingVolatility:
+    """Realized volatility over a trailing time window with a bounded sample count."""
+
+    def __init__(self, window=300.0, max_samples=4096):
+        self.window_ms = window * 1000
+        self.max_samples = max_samples
+        self._samples = deque()
+        self._sum = 0.0
+        self._last_mid = None
+
+    def update(self, ts_ms, mid):
+        if self._last_mid is not None:
+            r = math.log(mid / self._last_mid)
+            self._samples.append((ts_ms, r * r))
+            self._sum += r * r
+        self._last_mid = mid
+        samples = self._samples
+        while samples and (samples[0][0] <= ts_ms - self.window_ms or len(samples) > self.max_samples):
+            self._sum -= samples.popleft()[1]
+
+    @property
+    def count(self):
+        return len(self._samples)
+
+    def volatility(self, horizon=DAILY_SECONDS):
+        if not self._samples:
+            return 0.0
+        # Scaled by the window, as data.features.realized_volatility does for
+        # training, unless the sample cap cut the window short
+        span = self.window_ms / 1000
+        if len(self._samples) >= self.max_samples:
+            span = min(span, max((self._samples[-1][0] - self._samples[0][0]) / 1000, 1.0))
+        return math.sqrt(max(self._sum, 0.0) * horizon / span)
+
+
+class MicrostructureStats:
+    """
+    O(1)-per-tick estimators over top of book: EWMA and windowed realized
+    volatility, spread EWMA, order-flow imbalance and microprice.
+    """
+
+    def __init__(self, halflife=60.0, window=300.0, min_samples=20):
+        self.min_samples = min_samples
+        self.ewma_vol = EWMAVolatility(halflife)
+        self.rolling_vol = RollingVolatility(window)
+        self.spread = EWMA(halflife)
+        self.ofi = EWMA(halflife)
+        self.microprice = 0.0
+        self.imbalance = 0.0
+        self._prev = None
+
+    def update(self, ts_ms, best_bid, bid_qty, best_ask, ask_qty):
+        if not best_bid or not best_ask:
+            return
+        mid = (best_bid + best_ask) / 2
+        self.ewma_vol.update(ts_ms, mid)
+        self.rolling_vol.update(ts_ms, mid)
+        self.spread.update(ts_ms, (best_ask - best_bid) / mid)
+
+        depth = bid_qty + ask_qty
+        self.microprice = (best_bid * ask_qty + best_ask * bid_qty) / depth if depth else mid
+        self.imbalance = (bid_qty - ask_qty) / depth if depth else 0.0
+
+        # Cont-Kukanov-Stoikov order flow imbalance at the best levels
+        if self._prev is not None:
+            prev_bid, prev_bid_qty, prev_ask, prev_ask_qty = self._prev
+            e = 0.0
+            if best_bid >= prev_bid:
+                e += bid_qty
+            if best_bid <= prev_bid:
+                e -= prev_bid_qty
+            if best_ask <= prev_ask:
+                e -= ask_qty
+            if best_ask >= prev_ask:
+                e += prev_ask_qty
+            self.ofi.update(ts_ms, e)
+        self._prev = (best_bid, bid_qty, best_ask, ask_qty)
+
+    @property
+    def ready(self):
+        return self.ewma_vol.count >= self.min_samples
+
+    def volatility(self, horizon=DAILY_SECONDS):
+        """The volatility models are fed: the windowed estimate they were trained on."""
+        return self.rolling_vol.volatility(horizon)
+
+    def snapshot(self):
+        return {
+            'ewma_volatility': self.ewma_vol.volatility(),
+            'realized_volatility': self.rolling_vol.volatility(),
+            'spread_ewma': self.spread.value or 0.0,
+            'ofi': self.ofi.value or 0.0,
+            'imbalance': self.imbalance,
+            'microprice': self.microprice
+        }
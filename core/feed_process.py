@@ -0,0 +1,306 @@
+import multiprocessing
+import threading
+import time
+from queue import Empty
+from zlib import crc32
+from .shared_book import SharedBookTable, SharedOrderBook, CONNECTION_STATES
+from .tick_buffer import TickBuffer
+from .latency import latency as default_latency
+from .websocket_client import CONNECTED, STOPPED, LIVE, SYNCING, STALE
+from config import (
+    SYMBOL, BOOK_CHANNEL, FIXED_POINT, TICK_CAPACITY, TICK_LEVELS, TICK_OVERFLOW,
+    BOOK_STALE_AFTER, SHARED_BOOK_CAPACITY, SHARED_BOOK_LEVELS
+)
+
+# How often shards push connection health when no book update carries it
+HEALTH_INTERVAL = 0.2
+# How long a full table waits for shards to ack the clears of dropped symbols
+SLOT_ACK_TIMEOUT = 5.0
+
+
+def _run_shard(table_name, capacity, levels, channel, fixed_point, url, commands, acks):
+    """Shard process: one websocket client whose books are published to shared memory."""
+    from .websocket_client import OKXWebSocketClient
+
+    table = SharedBookTable(capacity, levels, name=table_name, create=False)
+    options = {'url': url} if url else {}
+    client = OKXWebSocketClient(symbols=[], channel=channel, fixed_point=fixed_point, **options)
+    slots = {}
+    # The feed thread and the health loop below both write slots
+    write_lock = threading.Lock()
+
+    def publish(symbol, book, ts):
+        slot = slots.get(symbol)
+        if slot is not None:
+            with write_lock:
+                table.publish(slot, book, client, ts)
+
+    client.add_listener(publish)
+    try:
+        while True:
+            try:
+                op, symbol, slot = commands.get(timeout=HEALTH_INTERVAL)
+            except Empty:
+                op = None
+            if op == 'stop':
+                break
+            if op == 'subscribe':
+                slots[symbol] = slot
+                client.subscribe(symbol)
+                if not client.running:
+                    client.start()
+            elif op == 'unsubscribe':
+                client.unsubscribe(symbol)
+                slots.pop(symbol, None)
+                with write_lock:
+                    table.clear(slot)
+                # Nothing writes this slot any more; the parent may hand it out
+                acks.put(slot)
+            with write_lock:
+                for symbol, slot in slots.items():
+                    book = client.get_book(symbol)
+                    if book is not None:
+                        table.publish_health(slot, book, client)
+    finally:
+        client.stop()
+        table.close()
+
+
+class ProcessFeedClient:
+    """
+    Drop-in for ``OKXWebSocketClient`` that runs JSON decoding and book
+    maintenance in ``shards`` worker processes (symbols are hashed to
+    shards) and reads the books back through a shared-memory seqlock table.
+
+    A watcher thread notices new book versions, snapshots them without
+    locking the writer, and calls listeners as the in-process client does.
+    """
+
+    def __init__(self, symbols=None, channel=BOOK_CHANNEL, shards=1, latency=None,
+                 fixed_point=FIXED_POINT, url=None, capacity=SHARED_BOOK_CAPACITY,
+                 levels=SHARED_BOOK_LEVELS, poll_interval=0.001):
+        self.channel = channel
+        self.shards = shards
+        self.latency = latency or default_latency
+        self.fixed_point = fixed_point
+        self.url = url
+        self.levels = levels
+        self.poll_interval = poll_interval
+        self.stale_after = BOOK_STALE_AFTER
+        self.table = SharedBookTable(capacity, levels)
+        self.books = {}
+        self.ticks = {}
+        # Trades aren't carried through shared memory; the online learner idles
+        self.trades = {}
+        self.running = False
+        self.thread = None
+        self._free = list(range(capacity - 1, -1, -1))
+        # Dropped symbols keep their slot until the shard acks the clear, so
+        # a late write can't land in another symbol's book
+        self._retired = {}
+        self._clearing = {}
+        self._acks = None
+        self._seen = {}
+        self._listeners = []
+        self._processes = []
+        self._commands = []
+        self._lock = threading.Lock()
+        for symbol in [SYMBOL] if symbols is None else symbols:
+            self._add_book(symbol)
+
+    @property
+    def symbols(self):
+        return list(self.books)
+
+    @property
+    def order_book(self):
+        return self.books.get(SYMBOL) or next(iter(self.books.values()), None)
+
+    def get_book(self, symbol):
+        return self.books.get(symbol)
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _shard(self, symbol):
+        return crc32(symbol.encode()) % self.shards
+
+    def _reclaim(self, timeout=0.0):
+        """Free the slots whose clears the shards have acked; caller holds ``_lock``."""
+        while self._acks is not None and self._clearing:
+            try:
+                slot = self._acks.get(timeout=timeout) if timeout else self._acks.get_nowait()
+            except Empty:
+                return
+            self._clearing[slot] -= 1
+            if self._clearing[slot]:
+                continue
+            del self._clearing[slot]
+            for symbol, retired in list(self._retired.items()):
+                if retired == slot:
+                    del self._retired[symbol]
+                    self._free.append(slot)
+            timeout = 0.0
+
+    def _add_book(self, symbol):
+        # A symbol picked up again before its clear was acked gets its own
+        # slot back; its shard clears the slot before resubscribing
+        slot = self._retired.pop(symbol, None)
+        if slot is None:
+            self._reclaim()
+            # A freshly started shard takes a moment to ack its first clear
+            deadline = time.monotonic() + SLOT_ACK_TIMEOUT
+            while not self._free and self._clearing and time.monotonic() < deadline:
+                self._reclaim(timeout=deadline - time.monotonic())
+            if not self._free:
+                raise RuntimeError(f"Shared book table is full ({self.table.capacity} symbols)")
+            slot = self._free.pop()
+            self.table.clear(slot)
+        self.books[symbol] = SharedOrderBook(self.table, slot, symbol)
+        self.ticks[symbol] = TickBuffer(TICK_CAPACITY, TICK_LEVELS, TICK_OVERFLOW)
+        self._seen[symbol] = 0
+        return slot
+
+    def _command(self, op, symbol, slot):
+        if self._commands:
+            self._commands[self._shard(symbol)].put((op, symbol, slot))
+
+    def subscribe(self, symbol):
+        with self._lock:
+            if symbol in self.books:
+                return self.books[symbol]
+            slot = self._add_book(symbol)
+            self._command('subscribe', symbol, slot)
+            return self.books[symbol]
+
+    def unsubscribe(self, symbol):
+        with self._lock:
+            book = self.books.pop(symbol, None)
+            if book is None:
+                return
+            self.ticks.pop(symbol, None)
+            self._seen.pop(symbol, None)
+            if not self._commands:
+                self.table.clear(book.slot)
+                self._free.append(book.slot)
+                return
+            self._command('unsubscribe', symbol, book.slot)
+            self._retired[symbol] = book.slot
+            self._clearing[book.slot] = self._clearing.get(book.slot, 0) + 1
+
+    # --- health, mirroring OKXWebSocketClient ---
+
+    @property
+    def state(self):
+        if not self.running:
+            return STOPPED
+        codes = [int(self.table.connection[b.slot]) for b in list(self.books.values())]
+        states = {CONNECTION_STATES[c] for c in codes}
+        # Report the worst shard: anything not connected wins
+        return next((s for s in ('reconnecting', 'connecting') if s in states), CONNECTED if states else STOPPED)
+
+    def book_state(self, symbol, now=None):
+        book = self.books.get(symbol)
+        if book is None or not book.valid or not self.running:
+            return SYNCING
+        if CONNECTION_STATES[int(self.table.connection[book.slot])] != CONNECTED:
+            return SYNCING
+        if (now or time.time()) - float(self.table.updated_at[book.slot]) > self.stale_after:
+            return STALE
+        return LIVE
+
+    def is_live(self, symbol):
+        return self.book_state(symbol) == LIVE
+
+    @property
+    def health(self):
+        now = time.time()
+        records = self.table.records
+        slots = [b.slot for b in list(self.books.values())]
+        last = max((float(records['updated_at'][s]) for s in slots), default=0.0)
+        return {
+            'state': self.state,
+            'reconnects': int(sum(records['reconnects'][s] for s in slots)),
+            'resyncs': int(sum(records['resyncs'][s] for s in slots)),
+            'last_error': None,
+            'last_message_age': now - last if last else None,
+            'books': {symbol: self.book_state(symbol, now) for symbol in list(self.books)},
+            'shards': self.shards
+        }
+
+    # --- lifecycle ---
+
+    def _watch(self):
+        versions = self.table.version
+        while self.running:
+            changed = False
+            for symbol, book in list(self.books.items()):
+                if versions[book.slot] == self._seen.get(symbol):
+                    continue
+                start_ns = time.perf_counter_ns()
+                version = book.refresh()
+                self.latency.record('shm_to_reader', time.perf_counter_ns() - start_ns)
+                # None: the shard died mid-write; readers keep the last snapshot
+                if version is None or symbol not in self._seen:
+                    continue
+                self._seen[symbol] = version
+                changed = True
+                ts = int(book.record['ts'])
+                self.ticks[symbol].append_book(book, ts)
+                for callback in list(self._listeners):
+                    callback(symbol, book, ts)
+            if not changed:
+                time.sleep(self.poll_interval)
+
+    def start(self):
+        if self.running:
+            return
+        context = multiprocessing.get_context('spawn')
+        self._commands = [context.Queue() for _ in range(self.shards)]
+        self._acks = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_run_shard,
+                args=(self.table.name, self.table.capacity, self.levels, self.channel,
+                      self.fixed_point, self.url, commands, self._acks),
+                daemon=True
+            )
+            for commands in self._commands
+        ]
+        for process in self._processes:
+            process.start()
+        with self._lock:
+            for symbol, book in self.books.items():
+                self._command('subscribe', symbol, book.slot)
+        self.running = True
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        for commands in self._commands:
+            commands.put(('stop', None, None))
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._commands = []
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        # The shards are gone, so slots still waiting on an ack are free too
+        self._acks = None
+        self._retired = {}
+        self._clearing = {}
+        used = {b.slot for b in self.books.values()}
+        self._free = [s for s in range(self.table.capacity - 1, -1, -1) if s not in used]
+
+    def close(self):
+        self.stop()
+        self.table.close()
+        self.table.unlink()
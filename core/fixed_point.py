@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+
+class FixedPoint:
+    """
+    Exact integer representation on a decimal step such as a tick or lot size.
+
+    Exchange strings are parsed digit-wise, so ``"27012.3"`` on a 0.1 tick is
+    always ``270123`` with no float rounding in between.
+    """
+
+    def __init__(self, step):
+        step = Decimal(str(step)).normalize()
+        self.step = step
+        self.decimals = max(0, -step.as_tuple().exponent)
+        self.denominator = 10 ** self.decimals
+        self.units = int(step * self.denominator)
+
+    def parse(self, value):
+        if isinstance(value, str) and 'e' not in value and 'E' not in value:
+            whole, _, frac = value.partition('.')
+            if self.decimals:
+                units = int(whole + frac[:self.decimals].ljust(self.decimals, '0'))
+            else:
+                units = int(whole)
+        else:
+            units = round(float(value) * self.denominator)
+        return units if self.units == 1 else units // self.units
+
+    def to_float(self, value):
+        # One integer product and one division keeps the result correctly rounded
+        return value * self.units / self.denominator
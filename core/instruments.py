@@ -0,0 +1,15 @@
+import logging
+from data.historical_data import fetch_instrument
+
+_specs = {}
+
+
+def get_instrument(symbol):
+    """Tick and lot size for ``symbol``, fetched once per process."""
+    if symbol not in _specs:
+        spec = fetch_instrument(symbol)
+        if not spec.get('tickSz') or not spec.get('lotSz'):
+            logging.warning(f"No tick/lot size for {symbol}; using float prices")
+            return {}
+        _specs[symbol] = spec
+    return _specs[symbol]
@@ -0,0 +1,150 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Hot-path stages, in pipeline order
+STAGES = (
+    'exchange_to_recv',
+    'recv_to_parsed',
+    'parsed_to_applied',
+    'applied_to_features',
+    'features_to_model',
+    'model_to_published',
+)
+
+SUB_BUCKET_BITS = 7          # 64..128 sub-buckets per power of two, < 1.6% error
+MAX_EXPONENT = 40            # values up to ~2^47 ns (~39 hours)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of nanosecond values.
+
+    Recording is a bit_length, a shift and one list increment, so it is cheap
+    enough for the per-message path. Quantiles report bucket upper bounds.
+    """
+
+    def __init__(self):
+        self.counts = [0] * ((MAX_EXPONENT + 1) << SUB_BUCKET_BITS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_ns):
+        value_ns = int(value_ns)
+        if value_ns < 0:
+            value_ns = 0
+        exponent = value_ns.bit_length() - SUB_BUCKET_BITS
+        if exponent < 0:
+            exponent = 0
+        elif exponent > MAX_EXPONENT:
+            exponent = MAX_EXPONENT
+            value_ns = min(value_ns, ((1 << SUB_BUCKET_BITS) - 1) << exponent)
+        self.counts[(exponent << SUB_BUCKET_BITS) + (value_ns >> exponent)] += 1
+        self.count += 1
+        self.total += value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    @staticmethod
+    def _upper_bound(index):
+        exponent = index >> SUB_BUCKET_BITS
+        mantissa = index & ((1 << SUB_BUCKET_BITS) - 1)
+        return ((mantissa + 1) << exponent) - 1
+
+    def quantiles(self, qs):
+        """Values (ns) at each quantile in ascending ``qs``."""
+        results = []
+        if not self.count:
+            return [0] * len(qs)
+        targets = [max(1, int(q * self.count + 0.999999)) for q in qs]
+        seen = 0
+        t = 0
+        for index, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and seen >= targets[t]:
+                results.append(min(self._upper_bound(index), self.max))
+                t += 1
+            if t == len(targets):
+                break
+        return results
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+class LatencyRecorder:
+    QUANTILES = (0.5, 0.99, 0.999)
+
+    def __init__(self, stages=STAGES):
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+
+    def record(self, stage, value_ns):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.record(value_ns)
+
+    def snapshot(self):
+        """Per-stage count, mean, p50/p99/p99.9 and max in milliseconds."""
+        snapshot = {}
+        for stage, h in self.histograms.items():
+            p50, p99, p999 = h.quantiles(self.QUANTILES)
+            snapshot[stage] = {
+                'count': h.count,
+                'mean_ms': h.total / h.count / 1e6 if h.count else 0.0,
+                'p50_ms': p50 / 1e6,
+                'p99_ms': p99 / 1e6,
+                'p999_ms': p999 / 1e6,
+                'max_ms': h.max / 1e6
+            }
+        return snapshot
+
+    def reset(self):
+        for h in self.histograms.values():
+            h.reset()
+
+    def to_prometheus(self, name='trade_app_stage_latency_seconds'):
+        lines = [
+            f"# HELP {name} Hot-path latency per pipeline stage.",
+            f"# TYPE {name} summary"
+        ]
+        max_lines = [f"# TYPE {name}_max gauge"]
+        for stage, h in self.histograms.items():
+            for q, value in zip(self.QUANTILES, h.quantiles(self.QUANTILES)):
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value / 1e9:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.total / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+            max_lines.append(f'{name}_max{{stage="{stage}"}} {h.max / 1e9:.9f}')
+        return "\n".join(lines + max_lines) + "\n"
+
+
+def serve_metrics(recorder, host='127.0.0.1', port=9108):
+    """Serve ``recorder`` in Prometheus text format at /metrics from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = recorder.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Process-wide recorder used by the feed and cost engine by default
+latency = LatencyRecorder()
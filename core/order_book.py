@@ -1,36 +1,176 @@
+import itertools
+import threading
+from zlib import crc32
+from .price_ladder import PriceLadder
+from .fixed_point import FixedPoint
+from .estimators import MicrostructureStats
+from config import FEATURE_DEPTH_BAND
+
+CHECKSUM_DEPTH = 25
+# Numbers each book object, since versions restart at 0 when a symbol is
+# resubscribed or the feed restarts
+BOOK_EPOCHS = itertools.count(1)
+
+
 class OrderBook:
-    def __init__(self):
-        self.bids = {}
-        self.asks = {}
+    def __init__(self, symbol=None, validate=False, tick_size=None, lot_size=None):
+        self.symbol = symbol
+        # With tick/lot sizes, ladders hold exact int ticks and lots; floats
+        # only appear through the price/size accessors below.
+        self.ticks = FixedPoint(tick_size) if tick_size else None
+        self.lots = FixedPoint(lot_size) if lot_size else None
+        self.stats = MicrostructureStats()
+        # Bumped once per applied message; with the per-side ladder versions
+        # it keys anything derived from the book state, together with ``epoch``
+        self.version = 0
+        self.epoch = next(BOOK_EPOCHS)
+        self.bids = PriceLadder(descending=True)
+        self.asks = PriceLadder()
         self.mid_price = 0.0
-        
+        self.validate = validate
+        self.valid = not validate
+        self.seq_id = None
+        # Held by the feed while applying a message and by readers taking a consistent view
+        self.lock = threading.Lock()
+        # Exchange strings per level, only kept when checksums are verified
+        self._raw_bids = {}
+        self._raw_asks = {}
+
     def update(self, data):
-        if 'data' in data:
-            book_data = data['data'][0]
-            self._update_side(self.bids, book_data['bids'])
-            self._update_side(self.asks, book_data['asks'])
-            self._calculate_mid_price()
-            
-    def _update_side(self, side, entries):
-        for price, quantity, *_ in entries:   
-            price = float(price)
-            quantity = float(quantity)
-            
+        """Apply a book message; returns False when the book needs a fresh snapshot."""
+        if 'data' not in data:
+            return True
+        book_data = data['data'][0]
+        channel = data.get('arg', {}).get('channel')
+
+        if data.get('action') == 'snapshot' or channel == 'books5':
+            self.clear()
+        elif self.validate:
+            if not self.valid or book_data.get('prevSeqId') != self.seq_id:
+                return self._invalidate()
+
+        self._update_side(self.bids, self._raw_bids, book_data['bids'])
+        self._update_side(self.asks, self._raw_asks, book_data['asks'])
+        self._calculate_mid_price()
+
+        if self.validate:
+            checksum = book_data.get('checksum')
+            if checksum is not None and self.checksum() != int(checksum):
+                return self._invalidate()
+            self.seq_id = book_data.get('seqId')
+        self.valid = True
+        self.version += 1
+        self.stats.update(
+            int(book_data.get('ts', 0)),
+            self.best_bid, self.quantity(self.bids.best_quantity),
+            self.best_ask, self.quantity(self.asks.best_quantity)
+        )
+        return True
+
+    @property
+    def side_versions(self):
+        return self.bids.version, self.asks.version
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+        self._raw_bids.clear()
+        self._raw_asks.clear()
+        self.mid_price = 0.0
+        self.seq_id = None
+
+    def invalidate(self):
+        """Mark the book unusable until the next snapshot, e.g. after a disconnect."""
+        self._invalidate()
+
+    def _invalidate(self):
+        self.valid = False
+        self.seq_id = None
+        return False
+
+    def _update_side(self, side, raw, entries):
+        validate = self.validate
+        parse_price = self.ticks.parse if self.ticks else float
+        parse_quantity = self.lots.parse if self.lots else float
+        for price_str, quantity_str, *_ in entries:
+            price = parse_price(price_str)
+            quantity = parse_quantity(quantity_str)
+
             if quantity == 0:
-                side.pop(price, None)
+                side.remove(price)
+                if validate:
+                    raw.pop(price, None)
             else:
-                side[price] = quantity  # Store as quantity instead of qty
-    
+                side.set(price, quantity)
+                if validate:
+                    raw[price] = f"{price_str}:{quantity_str}"
+
+    def checksum(self):
+        """OKX CRC32 over the top 25 levels, interleaving bid and ask strings."""
+        bids = [self._raw_bids[p] for p in self.bids.prices(CHECKSUM_DEPTH)]
+        asks = [self._raw_asks[p] for p in self.asks.prices(CHECKSUM_DEPTH)]
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.append(bids[i])
+            if i < len(asks):
+                parts.append(asks[i])
+        value = crc32(':'.join(parts).encode())
+        return value - (1 << 32) if value >= (1 << 31) else value
+
     def _calculate_mid_price(self):
-        best_bid = max(self.bids.keys()) if self.bids else 0
-        best_ask = min(self.asks.keys()) if self.asks else 0
+        best_bid = self.best_bid
+        best_ask = self.best_ask
         self.mid_price = (best_bid + best_ask) / 2 if best_bid and best_ask else 0
-    
+
+    def price(self, value):
+        return self.ticks.to_float(value) if self.ticks else value
+
+    def quantity(self, value):
+        return self.lots.to_float(value) if self.lots else value
+
+    @property
+    def best_bid(self):
+        return self.price(self.bids.best)
+
+    @property
+    def best_ask(self):
+        return self.price(self.asks.best)
+
+    @property
+    def spread(self):
+        best_bid = self.best_bid
+        best_ask = self.best_ask
+        return (best_ask - best_bid) / self.mid_price if best_bid and best_ask else 0
+
+    def side_arrays(self, side, n=None):
+        """Best-first (prices, quantities) float arrays for ``'bids'`` or ``'asks'``."""
+        ladder = self.asks if side == 'asks' else self.bids
+        prices, quantities = ladder.arrays(n)
+        if self.ticks:
+            prices = prices * self.ticks.units / self.ticks.denominator
+        if self.lots:
+            quantities = quantities * self.lots.units / self.lots.denominator
+        return prices, quantities
+
+    @property
+    def liquidity_depth(self):
+        return self.get_liquidity_depth()
+
+    @property
+    def feature_depth(self):
+        """Depth within the band the models' ``order_size_ratio`` was trained on."""
+        return self.get_liquidity_depth(FEATURE_DEPTH_BAND)
+
     def get_liquidity_depth(self, depth=0.1):
         upper = self.mid_price * (1 + depth)
         lower = self.mid_price * (1 - depth)
-        
-        bid_liq = sum(quantity for p, quantity in self.bids.items() if lower <= p <= upper)
-        ask_liq = sum(quantity for p, quantity in self.asks.items() if lower <= p <= upper)
-        
-        return bid_liq + ask_liq
\ No newline at end of file
+        if self.ticks:
+            # Compare in tick space; the bounds are already inclusive
+            upper = upper * self.ticks.denominator / self.ticks.units
+            lower = lower * self.ticks.denominator / self.ticks.units
+
+        bid_liq = self.bids.depth_to(lower) if self.bids.best <= upper else 0
+        ask_liq = self.asks.depth_to(upper) if self.asks.best >= lower else 0
+
+        return self.quantity(bid_liq + ask_liq)
@@ -0,0 +1,166 @@
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
+import numpy as np
+
+# Float running totals are re-summed exactly after this many changes
+RESYNC_EVERY = 4096
+
+
+class PriceLadder:
+    """
+    One side of the book, kept sorted best-first with lazy cumulative sizes.
+
+    The cumulative sizes are a prefix that stays valid down to the first
+    changed level and is extended on demand, so a depth lookup costs the
+    levels inside its band rather than the whole side. Quotes churn near the
+    top, so a narrow band rebuilds only a few levels; a band covering the
+    whole side is answered from a running total.
+    """
+
+    def __init__(self, descending=False):
+        self.descending = descending
+        self._sign = -1 if descending else 1
+        self._keys = []      # sign * price, ascending == best-first
+        self.levels = {}     # price -> quantity
+        self._cum = []       # cumulative quantity over the first len(_cum) levels
+        self._arrays = None
+        # Running sum of quantities, so whole-side depth never needs a rebuild
+        self._total = 0
+        self._changes = 0
+        # Bumped on every change; readers compare it to what they last saw
+        self.version = 0
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __bool__(self):
+        return bool(self.levels)
+
+    def __contains__(self, price):
+        return price in self.levels
+
+    def __getitem__(self, price):
+        return self.levels[price]
+
+    def __iter__(self):
+        return iter(self.prices())
+
+    def get(self, price, default=None):
+        return self.levels.get(price, default)
+
+    def keys(self):
+        return self.prices()
+
+    def items(self):
+        return [(p, self.levels[p]) for p in self.prices()]
+
+    def set(self, price, quantity):
+        if quantity == 0:
+            self.remove(price)
+            return
+        key = self._sign * price
+        idx = bisect_left(self._keys, key)
+        previous = self.levels.get(price)
+        if previous is None:
+            self._keys.insert(idx, key)
+            previous = 0
+        self.levels[price] = quantity
+        self._total += quantity - previous
+        self._changed(idx)
+
+    def remove(self, price):
+        quantity = self.levels.pop(price, None)
+        if quantity is None:
+            return
+        self._total = self._total - quantity if self.levels else 0
+        idx = bisect_left(self._keys, self._sign * price)
+        del self._keys[idx]
+        self._changed(idx)
+
+    def clear(self):
+        self._keys.clear()
+        self.levels.clear()
+        self._total = 0
+        self._cum.clear()
+        self._arrays = None
+        self.version += 1
+
+    def _changed(self, idx):
+        # Sizes above the changed level are still right
+        del self._cum[idx:]
+        self._arrays = None
+        self.version += 1
+        self._changes += 1
+        if self._changes >= RESYNC_EVERY:
+            self._changes = 0
+            if isinstance(self._total, float):
+                # Increments accumulate rounding error; fixed-point ints stay exact
+                self._total = math.fsum(self.levels.values())
+
+    @property
+    def best(self):
+        return self._sign * self._keys[0] if self._keys else 0
+
+    @property
+    def best_quantity(self):
+        return self.levels[self._sign * self._keys[0]] if self._keys else 0
+
+    def prices(self, n=None):
+        keys = self._keys if n is None else self._keys[:n]
+        return [self._sign * k for k in keys]
+
+    def top(self, n):
+        return [(p, self.levels[p]) for p in self.prices(n)]
+
+    def _extend(self, n):
+        """Make the first ``n`` cumulative sizes valid."""
+        cum = self._cum
+        start = len(cum)
+        if start >= n:
+            return
+        levels = self.levels
+        sign = self._sign
+        sizes = (levels[sign * k] for k in islice(self._keys, start, n))
+        # Skip the initial value accumulate yields first
+        cum.extend(islice(accumulate(sizes, initial=cum[-1] if start else 0), 1, None))
+
+    @property
+    def cumulative(self):
+        self._extend(len(self._keys))
+        return self._cum
+
+    @property
+    def total_quantity(self):
+        return self._total
+
+    def depth_to(self, price):
+        """Total quantity on levels priced at or better than ``price``."""
+        idx = bisect_right(self._keys, self._sign * price)
+        if idx == len(self._keys):
+            # The usual case for a wide band: the whole side, no rebuild
+            return self._total
+        if not idx:
+            return 0
+        self._extend(idx)
+        return self._cum[idx - 1]
+
+    def arrays(self, n=None):
+        """Best-first (prices, quantities) arrays, cached until the next change.
+
+        Float ladders give float64 arrays; fixed-point ladders give int64.
+        """
+        if self._arrays is None:
+            if n is not None and n < len(self._keys):
+                # Only the top is wanted; don't pay for converting the whole side
+                return self._to_arrays(self.prices(n))
+            self._arrays = self._to_arrays(self.prices())
+        prices, quantities = self._arrays
+        return (prices, quantities) if n is None else (prices[:n], quantities[:n])
+
+    def _to_arrays(self, prices):
+        dtype = np.int64 if prices and isinstance(prices[0], int) else float
+        return (
+            np.array(prices, dtype=dtype),
+            np.array([self.levels[p] for p in prices], dtype=dtype)
+        )
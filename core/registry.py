@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from collections import Counter
+from functools import partial
+from .websocket_client import OKXWebSocketClient
+from config import FEED_PROCESSES
+
+
+class FeedRegistry:
+    """
+    One websocket client per process, shared by every session.
+
+    Sessions acquire the symbols they watch; a symbol stays subscribed while
+    anyone holds it, so N viewers of BTC-USDT cost one subscription.
+    """
+
+    def __init__(self, client_factory=OKXWebSocketClient):
+        self._client_factory = client_factory
+        self._client = None
+        self._refs = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._client_factory(symbols=[])
+            return self._client
+
+    def acquire(self, symbol):
+        client = self.client
+        with self._lock:
+            self._refs[symbol] += 1
+            if self._refs[symbol] == 1:
+                client.subscribe(symbol)
+            if not client.running:
+                client.start()
+        return client.get_book(symbol)
+
+    def release(self, symbol):
+        with self._lock:
+            if self._refs[symbol] <= 0:
+                return
+            self._refs[symbol] -= 1
+            if self._refs[symbol] == 0:
+                del self._refs[symbol]
+                self._client.unsubscribe(symbol)
+
+    def subscribers(self):
+        with self._lock:
+            return dict(self._refs)
+
+
+def _default_model_factories():
+    from models.slippage import SlippageModel, MODEL_PATH as SLIPPAGE_PATH
+    from models.maker_taker import MakerTakerPredictor, MODEL_PATH as MAKER_TAKER_PATH
+    from models.market_impact import MarketImpactCalculator, MODEL_PATH as IMPACT_PATH
+    return {
+        'slippage': (SlippageModel, SLIPPAGE_PATH),
+        'maker_taker': (MakerTakerPredictor, MAKER_TAKER_PATH),
+        'impact': (MarketImpactCalculator, IMPACT_PATH)
+    }
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, process-wide model set with hot reload by file mtime.
+
+    ``get()`` always returns the same dict; reloads replace entries in it, so
+    engines holding the dict pick up new models without being rebuilt.
+    Large estimators are loaded with ``mmap_mode`` so their arrays are paged
+    in from the joblib file rather than copied into each process heap.
+    """
+
+    def __init__(self, factories=None, mmap_mode='r', check_interval=5.0):
+        self._factories = factories
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self.models = {}
+        self.mtimes = {}
+        self.version = 0
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def loaded(self):
+        return bool(self.models)
+
+    def get(self):
+        with self._lock:
+            if not self.models:
+                from models.execution import ExecutionEngine
+                self._factories = self._factories or _default_model_factories()
+                for name in self._factories:
+                    self._load(name)
+                self.models['execution'] = ExecutionEngine()
+                self._start_watcher()
+        return self.models
+
+    def _load(self, name):
+        factory, path = self._factories[name]
+        mtime = os.path.getmtime(path)
+        model = factory()
+        model.load(mmap_mode=self.mmap_mode)
+        self.models[name] = model
+        self.mtimes[name] = mtime
+        self.version += 1
+
+    def reload_changed(self):
+        """Reload any model whose file changed since it was loaded; returns their names."""
+        changed = []
+        with self._lock:
+            for name, (_, path) in self._factories.items():
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if mtime != self.mtimes.get(name):
+                    try:
+                        self._load(name)
+                        changed.append(name)
+                    except Exception as e:
+                        # A half-written file keeps the previous model serving
+                        print(f"Model reload failed for {name}: {e}")
+        return changed
+
+    def _start_watcher(self):
+        if self._watcher is not None or not self.check_interval:
+            return
+
+        def watch():
+            while True:
+                time.sleep(self.check_interval)
+                self.reload_changed()
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+
+
+_feeds = None
+_models = None
+_learner = None
+_init_lock = threading.Lock()
+
+
+def _default_client_factory():
+    if FEED_PROCESSES:
+        from .feed_process import ProcessFeedClient
+        return partial(ProcessFeedClient, shards=FEED_PROCESSES)
+    return OKXWebSocketClient
+
+
+def get_feeds():
+    global _feeds
+    with _init_lock:
+        if _feeds is None:
+            _feeds = FeedRegistry(_default_client_factory())
+        return _feeds
+
+
+def get_models():
+    global _models
+    with _init_lock:
+        if _models is None:
+            _models = ModelRegistry()
+        return _models
+
+
+def get_learner():
+    """Process-wide online learner over the shared feed and models, started on first use."""
+    global _learner
+    feeds, models = get_feeds(), get_models()
+    with _init_lock:
+        if _learner is None:
+            from models.online import OnlineLearner
+            _learner = OnlineLearner(feeds.client, models.get())
+            _learner.start()
+        return _learner
@@ -0,0 +1,79 @@
+import numpy as np
+
+OVERWRITE = 'overwrite'
+DROP = 'drop'
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of structured rows.
+
+    Every row is written twice into a mirrored array of ``2 * capacity`` so the
+    most recent ``n`` rows are always one contiguous slice, and ``latest`` can
+    hand out views instead of copies.
+
+    ``overflow`` decides what happens when ``capacity`` rows are unread:
+    ``OVERWRITE`` drops the oldest unread row, ``DROP`` refuses the new one.
+    Rows are only unread once a consumer has called ``drain()``: until then
+    readers use ``latest()``, which wants the newest rows, so a full buffer
+    overwrites its oldest row under either policy.
+    """
+
+    def __init__(self, dtype, capacity, overflow=OVERWRITE):
+        if overflow not in (OVERWRITE, DROP):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.overflow = overflow
+        self._data = np.zeros(2 * capacity, dtype=self.dtype)
+        self._next = 0       # slot the next row is written to
+        self.count = 0       # rows held, at most capacity
+        self.unread = 0      # rows not yet returned by drain()
+        self.draining = False  # set by the first drain()
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def _claim(self):
+        """Return the slot for a new row, or None if it must be dropped."""
+        if self.unread == self.capacity:
+            if self.overflow == DROP and self.draining:
+                self.dropped += 1
+                return None
+            self.dropped += 1
+            self.unread -= 1
+        return self._next
+
+    def _commit(self, slot):
+        self._data[slot + self.capacity] = self._data[slot]
+        self._next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.unread += 1
+        self.written += 1
+
+    def append(self, row):
+        slot = self._claim()
+        if slot is None:
+            return False
+        self._data[slot] = row
+        self._commit(slot)
+        return True
+
+    def latest(self, n=None):
+        """Zero-copy view of the last ``n`` rows, oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        end = self._next + self.capacity
+        return self._data[end - n:end]
+
+    def drain(self):
+        """View of the rows appended since the previous drain, oldest first."""
+        rows = self.latest(self.unread)
+        self.unread = 0
+        self.draining = True
+        return rows
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+        self.unread = 0
@@ -0,0 +1,272 @@
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from .order_book import BOOK_EPOCHS
+
+# Connection states as stored in shared memory, indexed by the published code
+CONNECTION_STATES = ('stopped', 'connecting', 'connected', 'reconnecting')
+
+# How long a reader retries a slot whose writer is mid-write before giving
+# up and keeping its last good copy (a writer that died leaves seq odd)
+READ_TIMEOUT = 0.05
+
+STATS_FIELDS = (
+    'ewma_volatility',
+    'realized_volatility',
+    'spread_ewma',
+    'ofi',
+    'imbalance',
+    'microprice'
+)
+
+
+def shared_book_dtype(levels):
+    return np.dtype([
+        ('seq', 'i8'),             # seqlock counter, odd while a write is in progress
+        ('version', 'i8'),
+        ('ts', 'i8'),
+        ('updated_at', 'f8'),      # writer wall clock, for staleness across processes
+        ('valid', 'i8'),
+        ('connection', 'i8'),
+        ('reconnects', 'i8'),
+        ('resyncs', 'i8'),
+        ('best_bid', 'f8'),
+        ('best_ask', 'f8'),
+        ('mid_price', 'f8'),
+        ('spread', 'f8'),
+        ('liquidity_depth', 'f8'),
+        ('feature_depth', 'f8'),
+        ('stats_ready', 'i8'),
+        ('volatility', 'f8'),
+        ('stats', 'f8', (len(STATS_FIELDS),)),
+        ('bid_levels', 'i8'),
+        ('ask_levels', 'i8'),
+        ('bid_px', 'f8', (levels,)),
+        ('bid_sz', 'f8', (levels,)),
+        ('ask_px', 'f8', (levels,)),
+        ('ask_sz', 'f8', (levels,)),
+    ], align=True)
+
+
+class SharedBookTable:
+    """
+    Fixed table of book slots in shared memory, one writer per slot.
+
+    The writer bumps ``seq`` to odd, fills the record, and bumps it back to
+    even; readers copy the record and retry if ``seq`` was odd or moved.
+    Neither side takes a lock, so a slow reader can never stall the feed.
+    Ordering relies on stores becoming visible in program order, which holds
+    on x86; elsewhere prefer the in-process feed.
+    """
+
+    def __init__(self, capacity, levels, name=None, create=True):
+        self.capacity = capacity
+        self.levels = levels
+        self.dtype = shared_book_dtype(levels)
+        size = self.dtype.itemsize * capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+        self.records = np.ndarray((capacity,), dtype=self.dtype, buffer=self.shm.buf)
+        if create:
+            self.records[:] = np.zeros(capacity, dtype=self.dtype)
+        # Field views so the hot path indexes plain arrays
+        self.seq = self.records['seq']
+        self.version = self.records['version']
+        self.valid = self.records['valid']
+        self.connection = self.records['connection']
+        self.updated_at = self.records['updated_at']
+
+    # --- writer side ---
+
+    def _begin(self, slot):
+        self.seq[slot] += 1
+
+    def _end(self, slot):
+        self.seq[slot] += 1
+
+    def publish(self, slot, order_book, client, ts):
+        """Copy ``order_book``'s top levels, features and stats into ``slot``."""
+        record = self.records[slot]
+        bid_px, bid_sz = order_book.side_arrays('bids', self.levels)
+        ask_px, ask_sz = order_book.side_arrays('asks', self.levels)
+        stats = order_book.stats
+        snapshot = stats.snapshot()
+        self._begin(slot)
+        record['version'] += 1
+        record['ts'] = ts
+        record['updated_at'] = time.time()
+        record['valid'] = order_book.valid
+        record['best_bid'] = order_book.best_bid
+        record['best_ask'] = order_book.best_ask
+        record['mid_price'] = order_book.mid_price
+        record['spread'] = order_book.spread
+        record['liquidity_depth'] = order_book.liquidity_depth
+        record['feature_depth'] = order_book.feature_depth
+        record['stats_ready'] = stats.ready
+        record['volatility'] = stats.volatility()
+        record['stats'] = [snapshot[f] for f in STATS_FIELDS]
+        record['bid_levels'] = n = len(bid_px)
+        record['bid_px'][:n] = bid_px
+        record['bid_sz'][:n] = bid_sz
+        record['ask_levels'] = n = len(ask_px)
+        record['ask_px'][:n] = ask_px
+        record['ask_sz'][:n] = ask_sz
+        self._write_health(record, order_book, client)
+        self._end(slot)
+
+    def publish_health(self, slot, order_book, client):
+        record = self.records[slot]
+        self._begin(slot)
+        record['valid'] = order_book.valid
+        self._write_health(record, order_book, client)
+        self._end(slot)
+
+    @staticmethod
+    def _write_health(record, order_book, client):
+        record['connection'] = CONNECTION_STATES.index(client.state)
+        record['reconnects'] = client.reconnects
+        record['resyncs'] = client.resyncs
+
+    def clear(self, slot):
+        record = self.records[slot]
+        self._begin(slot)
+        for name in self.dtype.names:
+            if name != 'seq':
+                record[name] = 0
+        self._end(slot)
+
+    # --- reader side ---
+
+    def read(self, slot, out, timeout=READ_TIMEOUT):
+        """
+        Consistent copy of ``slot`` into the 0-d record array ``out``.
+
+        Returns False, with ``out`` untouched, if none could be taken within
+        ``timeout`` seconds.
+        """
+        seq = self.seq
+        records = self.records
+        deadline = None
+        while True:
+            before = seq[slot]
+            if not before & 1:
+                # Copied aside first so a torn read never reaches ``out``
+                record = np.array(records[slot])
+                if seq[slot] == before:
+                    out[()] = record
+                    return True
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                return False
+            time.sleep(0)
+
+    def close(self):
+        # Views must go before the mapping can be released
+        self.records = self.seq = self.version = self.valid = None
+        self.connection = self.updated_at = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedStats:
+    """Read-only stand-in for ``MicrostructureStats`` over a published record."""
+
+    def __init__(self, record):
+        self._record = record
+
+    @property
+    def ready(self):
+        return bool(self._record['stats_ready'])
+
+    def volatility(self):
+        return float(self._record['volatility'])
+
+    def snapshot(self):
+        return dict(zip(STATS_FIELDS, self._record['stats'].tolist()))
+
+
+class SharedOrderBook:
+    """
+    Reader-side view of a book maintained in another process.
+
+    ``refresh`` takes a seqlock snapshot of the slot into a private record;
+    the accessors mirror ``OrderBook`` so the cost engine, tick buffers and
+    the dashboard work unchanged. Ladders are limited to the published top
+    levels, except ``liquidity_depth`` and ``feature_depth``, which the
+    writer computes on the full book.
+    """
+
+    def __init__(self, table, slot, symbol):
+        self.table = table
+        self.slot = slot
+        self.symbol = symbol
+        self.lock = threading.Lock()
+        self.record = np.zeros((), dtype=table.dtype)
+        self.stats = SharedStats(self.record)
+        self.epoch = next(BOOK_EPOCHS)
+
+    def refresh(self):
+        """Take a fresh snapshot; returns its version, or None if the slot stayed mid-write."""
+        with self.lock:
+            previous = int(self.record['version'])
+            if not self.table.read(self.slot, self.record):
+                return None
+            if self.record['version'] < previous:
+                # The slot was cleared under us; earlier versions mean another book
+                self.epoch = next(BOOK_EPOCHS)
+        return int(self.record['version'])
+
+    @property
+    def version(self):
+        return int(self.record['version'])
+
+    @property
+    def valid(self):
+        # Read live, so an invalidation shows up before the next book update
+        return bool(self.table.valid[self.slot]) and self.version > 0
+
+    @property
+    def updated_at(self):
+        return float(self.record['updated_at'])
+
+    @property
+    def mid_price(self):
+        return float(self.record['mid_price'])
+
+    @property
+    def best_bid(self):
+        return float(self.record['best_bid'])
+
+    @property
+    def best_ask(self):
+        return float(self.record['best_ask'])
+
+    @property
+    def spread(self):
+        return float(self.record['spread'])
+
+    @property
+    def liquidity_depth(self):
+        return float(self.record['liquidity_depth'])
+
+    @property
+    def feature_depth(self):
+        return float(self.record['feature_depth'])
+
+    def get_liquidity_depth(self, depth=0.1):
+        mid = self.mid_price
+        bid_px, bid_sz = self.side_arrays('bids')
+        ask_px, ask_sz = self.side_arrays('asks')
+        return float(bid_sz[bid_px >= mid * (1 - depth)].sum() + ask_sz[ask_px <= mid * (1 + depth)].sum())
+
+    def side_arrays(self, side, n=None):
+        """Best-first (prices, quantities) copies of the published levels."""
+        prefix = 'ask' if side == 'asks' else 'bid'
+        count = int(self.record[f'{prefix}_levels'])
+        if n is not None:
+            count = min(count, n)
+        return self.record[f'{prefix}_px'][:count].copy(), self.record[f'{prefix}_sz'][:count].copy()
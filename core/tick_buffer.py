@@ -0,0 +1,46 @@
+import numpy as np
+from .ring_buffer import RingBuffer, OVERWRITE
+
+
+def tick_dtype(levels):
+    return np.dtype([
+        ('ts', 'i8'),
+        ('best_bid', 'f8'),
+        ('best_ask', 'f8'),
+        ('mid', 'f8'),
+        ('bid_px', 'f8', (levels,)),
+        ('bid_sz', 'f8', (levels,)),
+        ('ask_px', 'f8', (levels,)),
+        ('ask_sz', 'f8', (levels,)),
+    ])
+
+
+class TickBuffer(RingBuffer):
+    """Columnar history of top-of-book snapshots, one row per applied update."""
+
+    def __init__(self, capacity, levels=5, overflow=OVERWRITE):
+        super().__init__(tick_dtype(levels), capacity, overflow)
+        self.levels = levels
+
+    def append_book(self, order_book, ts):
+        slot = self._claim()
+        if slot is None:
+            return False
+        row = self._data[slot]
+        row['ts'] = ts
+        row['best_bid'] = order_book.best_bid
+        row['best_ask'] = order_book.best_ask
+        row['mid'] = order_book.mid_price
+        self._fill(row['bid_px'], row['bid_sz'], order_book.side_arrays('bids', self.levels))
+        self._fill(row['ask_px'], row['ask_sz'], order_book.side_arrays('asks', self.levels))
+        self._commit(slot)
+        return True
+
+    @staticmethod
+    def _fill(prices, sizes, levels):
+        level_prices, level_sizes = levels
+        n = len(level_prices)
+        prices[:n] = level_prices
+        sizes[:n] = level_sizes
+        prices[n:] = 0
+        sizes[n:] = 0
@@ -0,0 +1,55 @@
+import math
+import numpy as np
+from .ring_buffer import RingBuffer, OVERWRITE
+
+TRADE_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('price', 'f8'),
+    ('size', 'f8'),
+    ('side', 'i1'),            # taker side: 1 buy, -1 sell
+    # Book state when the trade arrived
+    ('book_version', 'i8'),
+    ('mid', 'f8'),
+    ('best_bid', 'f8'),
+    ('best_ask', 'f8'),
+    ('spread', 'f8'),
+    ('liquidity', 'f8'),
+    ('feature_depth', 'f8'),
+    ('volatility', 'f8'),      # NaN until the book's estimator has warmed up
+])
+
+
+class TradeBuffer(RingBuffer):
+    """Columnar history of public trades, each joined to its book at arrival."""
+
+    def __init__(self, capacity, overflow=OVERWRITE):
+        super().__init__(TRADE_DTYPE, capacity, overflow)
+        # Trades that arrived while the book was empty or resyncing
+        self.unjoined = 0
+
+    def append_trades(self, trades, order_book):
+        """Append OKX ``trades`` channel rows; the caller holds ``order_book.lock``."""
+        if not order_book.valid or not order_book.mid_price:
+            self.unjoined += len(trades)
+            return 0
+        stats = order_book.stats
+        book = (
+            order_book.version,
+            order_book.mid_price,
+            order_book.best_bid,
+            order_book.best_ask,
+            order_book.spread,
+            order_book.liquidity_depth,
+            order_book.feature_depth,
+            stats.volatility() if stats.ready else math.nan
+        )
+        appended = 0
+        for trade in trades:
+            slot = self._claim()
+            if slot is None:
+                continue
+            side = 1 if trade['side'] == 'buy' else -1
+            self._data[slot] = (int(trade['ts']), float(trade['px']), float(trade['sz']), side) + book
+            self._commit(slot)
+            appended += 1
+        return appended
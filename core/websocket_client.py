@@ -1,38 +1,287 @@
 import asyncio
 import websockets
 import json
+import random
 import threading
-from queue import Queue
+import time
 from .order_book import OrderBook
-from config import OKX_WS_URL, SYMBOL
+from .tick_buffer import TickBuffer
+from .trade_buffer import TradeBuffer
+from .latency import latency as default_latency
+from .instruments import get_instrument
+from config import (
+    OKX_WS_URL, SYMBOL, BOOK_CHANNEL, FIXED_POINT,
+    TICK_CAPACITY, TICK_LEVELS, TICK_OVERFLOW,
+    HEARTBEAT_INTERVAL, PONG_TIMEOUT, RECONNECT_MIN_DELAY, RECONNECT_MAX_DELAY,
+    BOOK_STALE_AFTER, TRADE_CHANNEL, INGEST_TRADES, ONLINE_LEARNING, TRADE_CAPACITY
+)
+
+INCREMENTAL_CHANNELS = ('books', 'books-l2-tbt', 'books50-l2-tbt')
+
+# Connection states reported by ``OKXWebSocketClient.health``
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+RECONNECTING = 'reconnecting'
+STOPPED = 'stopped'
+
+# Per-book states: ``live`` books are safe to price against
+LIVE = 'live'
+SYNCING = 'syncing'
+STALE = 'stale'
+
+
+class StaleConnection(Exception):
+    pass
 
 
 class OKXWebSocketClient:
-    def __init__(self):
-        self.order_book = OrderBook()
-        self.data_queue = Queue()
+    def __init__(self, symbols=None, channel=BOOK_CHANNEL, recorder=None, latency=None,
+                 fixed_point=FIXED_POINT, url=OKX_WS_URL,
+                 trade_channel=TRADE_CHANNEL if INGEST_TRADES or ONLINE_LEARNING else None):
+        self.url = url
+        self.channel = channel
+        # Trades are joined to the book, so they ride the same connection
+        self.trade_channel = trade_channel
+        self.fixed_point = fixed_point
+        self.recorder = recorder
+        self.latency = latency or default_latency
+        self.books = {}
+        self.ticks = {}
+        self.trades = {}
         self.running = False
         self.thread = None
+        self.state = STOPPED
+        self.heartbeat_interval = HEARTBEAT_INTERVAL
+        self.pong_timeout = PONG_TIMEOUT
+        self.reconnect_delay = (RECONNECT_MIN_DELAY, RECONNECT_MAX_DELAY)
+        self.stale_after = BOOK_STALE_AFTER
+        self.resyncs = 0
+        self.reconnects = 0
+        self.last_error = None
+        self._resyncing = set()
+        self._last_message = None
+        self._last_update = {}
+        self._loop = None
+        self._ws = None
+        self._stopping = None
+        self._listeners = []
+        for symbol in [SYMBOL] if symbols is None else symbols:
+            self._add_book(symbol)
+
+    @property
+    def symbols(self):
+        return list(self.books)
+
+    @property
+    def order_book(self):
+        return self.books.get(SYMBOL) or next(iter(self.books.values()), None)
+
+    def get_book(self, symbol):
+        return self.books.get(symbol)
+
+    def add_listener(self, callback):
+        """Call ``callback(symbol, order_book, ts)`` on the feed thread after each applied update."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _add_book(self, symbol):
+        spec = get_instrument(symbol) if self.fixed_point else {}
+        self.books[symbol] = OrderBook(
+            symbol,
+            validate=self.channel in INCREMENTAL_CHANNELS,
+            tick_size=spec.get('tickSz'),
+            lot_size=spec.get('lotSz')
+        )
+        self.ticks[symbol] = TickBuffer(TICK_CAPACITY, TICK_LEVELS, TICK_OVERFLOW)
+        if self.trade_channel:
+            self.trades[symbol] = TradeBuffer(TRADE_CAPACITY)
+
+    def subscribe(self, symbol):
+        """Start streaming ``symbol``; safe to call from any thread while running."""
+        if symbol in self.books:
+            return self.books[symbol]
+        self._add_book(symbol)
+        self._send_threadsafe("subscribe", [symbol])
+        return self.books[symbol]
+
+    def unsubscribe(self, symbol):
+        if symbol not in self.books:
+            return
+        self._send_threadsafe("unsubscribe", [symbol])
+        self.books.pop(symbol, None)
+        self.ticks.pop(symbol, None)
+        self.trades.pop(symbol, None)
+        self._last_update.pop(symbol, None)
+        self._resyncing.discard(symbol)
+
+    def _send_threadsafe(self, op, symbols):
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._send(self._ws, op, symbols), self._loop)
+
+    def _subscription(self, op, symbols, channels=None):
+        if channels is None:
+            channels = [self.channel] + ([self.trade_channel] if self.trade_channel else [])
+        return json.dumps({
+            "op": op,
+            "args": [{"channel": c, "instId": s} for s in symbols for c in channels]
+        })
+
+    async def _send(self, ws, op, symbols, channels=None):
+        await ws.send(self._subscription(op, symbols, channels))
+
+    def backoff(self, attempt):
+        """
+        Exponential backoff with equal jitter for the ``attempt``-th retry
+        (0-based): uniform between half and all of the capped step, so retries
+        spread out but never fire back to back.
+        """
+        min_delay, max_delay = self.reconnect_delay
+        cap = min(max_delay, min_delay * 2 ** attempt)
+        return random.uniform(cap / 2, cap)
+
+    def book_state(self, symbol, now=None):
+        book = self.books.get(symbol)
+        last = self._last_update.get(symbol)
+        if book is None or not book.valid or last is None or self.state != CONNECTED:
+            return SYNCING
+        if (now or time.monotonic()) - last > self.stale_after:
+            return STALE
+        return LIVE
+
+    def is_live(self, symbol):
+        return self.book_state(symbol) == LIVE
+
+    @property
+    def health(self):
+        now = time.monotonic()
+        return {
+            'state': self.state,
+            'reconnects': self.reconnects,
+            'resyncs': self.resyncs,
+            'last_error': self.last_error,
+            'last_message_age': now - self._last_message if self._last_message else None,
+            'books': {symbol: self.book_state(symbol, now) for symbol in list(self.books)}
+        }
+
+    def _invalidate_books(self):
+        # Nothing received while disconnected, so every book is suspect until
+        # the resubscribe delivers a fresh snapshot
+        for book in list(self.books.values()):
+            with book.lock:
+                book.invalidate()
+        self._resyncing.clear()
 
     async def _connect(self):
-        async with websockets.connect(OKX_WS_URL) as ws:
-            subscription = {
-                "op": "subscribe",
-                "args": [{"channel": "books5", "instId": SYMBOL}]
-            }
-            await ws.send(json.dumps(subscription))
-            
-            while self.running:
-                try:
-                    data = await ws.recv()
-                    self._process_message(json.loads(data))
-                except Exception as e:
-                    print(f"WebSocket error: {e}")
-
-    def _process_message(self, data):
+        self._stopping = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        attempt = 0
+        while self.running:
+            self.state = RECONNECTING if self.reconnects else CONNECTING
+            received = False
+            try:
+                # OKX wants its own text heartbeat, so protocol pings are off
+                async with websockets.connect(self.url, ping_interval=None) as ws:
+                    self._ws = ws
+                    self.state = CONNECTED
+                    self.last_error = None
+                    if self.books:
+                        await self._send(ws, "subscribe", self.symbols)
+                    received = await self._receive(ws)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException, StaleConnection) as e:
+                if self.running:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    print(f"WebSocket error: {self.last_error}")
+            finally:
+                self._ws = None
+                self._invalidate_books()
+            if not self.running:
+                break
+            # A session that delivered data resets the backoff
+            attempt = 0 if received else attempt + 1
+            self.reconnects += 1
+            self.state = RECONNECTING
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.backoff(attempt))
+            except asyncio.TimeoutError:
+                pass
+        self.state = STOPPED
+
+    async def _receive(self, ws):
+        """Read until stopped; raises when the connection fails or goes quiet."""
+        received = False
+        awaiting_pong = False
+        while self.running:
+            try:
+                data = await asyncio.wait_for(
+                    ws.recv(), self.pong_timeout if awaiting_pong else self.heartbeat_interval
+                )
+            except asyncio.TimeoutError:
+                if awaiting_pong:
+                    raise StaleConnection(f"no pong within {self.pong_timeout}s")
+                await ws.send('ping')
+                awaiting_pong = True
+                continue
+            recv_ns = time.perf_counter_ns()
+            recv_ms = time.time() * 1000
+            self._last_message = time.monotonic()
+            awaiting_pong = False
+            if data == 'pong':
+                continue
+            try:
+                message = json.loads(data)
+                parsed_ns = time.perf_counter_ns()
+                self.latency.record('recv_to_parsed', parsed_ns - recv_ns)
+                symbol = self._process_message(message, recv_ms)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                print(f"Bad message: {e}")
+                continue
+            received = True
+            if symbol is not None:
+                await self._resync(ws, symbol)
+        return received
+
+    async def _resync(self, ws, symbol):
+        # Re-subscribing makes OKX push a fresh snapshot for the instrument
+        if symbol in self._resyncing:
+            return
+        self._resyncing.add(symbol)
+        self.resyncs += 1
+        await self._send(ws, "unsubscribe", [symbol], [self.channel])
+        await self._send(ws, "subscribe", [symbol], [self.channel])
+
+    def _process_message(self, data, recv_ms=None):
+        """Route a message to its book; returns the symbol if it needs a resync."""
         if 'data' in data:
-            self.order_book.update(data)
-            self.data_queue.put(data)
+            symbol = data['arg']['instId']
+            book = self.books.get(symbol)
+            if book is None:
+                return None
+            if data['arg'].get('channel') == self.trade_channel:
+                trades = self.trades.get(symbol)
+                if trades is not None:
+                    with book.lock:
+                        trades.append_trades(data['data'], book)
+                return None
+            start_ns = time.perf_counter_ns()
+            with book.lock:
+                applied = book.update(data)
+            self.latency.record('parsed_to_applied', time.perf_counter_ns() - start_ns)
+            if not applied:
+                return symbol
+            self._resyncing.discard(symbol)
+            self._last_update[symbol] = time.monotonic()
+            if self.recorder is not None:
+                self.recorder.record(symbol, data)
+            ts = int(data['data'][0].get('ts', 0))
+            if recv_ms is not None and ts:
+                self.latency.record('exchange_to_recv', (recv_ms - ts) * 1e6)
+            self.ticks[symbol].append_book(book, ts)
+            for callback in self._listeners:
+                callback(symbol, book, ts)
+        return None
 
     def start(self):
         self.running = True
@@ -44,5 +293,16 @@ class OKXWebSocketClient:
 
     def stop(self):
         self.running = False
+        # Wake the loop out of recv() or a backoff wait
+        loop, ws = self._loop, self._ws
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._stopping.set)
+                if ws is not None:
+                    asyncio.run_coroutine_threadsafe(ws.close(), loop)
+            except RuntimeError:
+                pass
         if self.thread:
-            self.thread.join()
\ No newline at end of file
+            self.thread.join()
+        if self.recorder is not None:
+            self.recorder.close()
\ No newline at end of file
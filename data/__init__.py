@@ -1,9 +1,21 @@
 from .historical_data import (
     fetch_historical_trades,
-    fetch_order_book_snapshots
+    fetch_order_book_snapshots,
+    fetch_instrument
 )
+from .recorder import TickRecorder, BookReplayer
+from .backfill import HistoryDownloader, RateLimiter
+from .features import FeatureStore, build_features, live_features
 
 __all__ = [
     'fetch_historical_trades',
-    'fetch_order_book_snapshots'
+    'fetch_order_book_snapshots',
+    'fetch_instrument',
+    'TickRecorder',
+    'BookReplayer',
+    'HistoryDownloader',
+    'RateLimiter',
+    'FeatureStore',
+    'build_features',
+    'live_features'
 ]
\ No newline at end of file
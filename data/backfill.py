@@ -0,0 +1,211 @@
+import os
+import time
+import logging
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from .historical_data import (
+    OKX_REST_URL, create_session, safe_float_conversion
+)
+
+TRADE_COLUMNS = ['trade_id', 'timestamp', 'price', 'quantity', 'side']
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+COMPLETE_PART = 'part-0.parquet'
+# Partition file of a day still in progress, named by the ms it covers up to
+PARTIAL_PART = 'partial-{until}.parquet'
+
+
+class RateLimiter:
+    """Token bucket shared by all download threads."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HistoryDownloader:
+    """
+    Bulk trade backfill over a date range with a local Parquet cache.
+
+    Hourly windows are downloaded concurrently on one pooled session, each
+    paged backwards through ``/market/history-trades``. Completed UTC days are
+    written to ``<cache_dir>/trades/symbol=<symbol>/date=<YYYY-MM-DD>/`` and
+    never fetched again. The current day is cached up to the start of the
+    hour in progress, and later calls only fetch the hours after that; hours
+    that haven't started yet are never requested.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/cache",
+        base_url: str = OKX_REST_URL,
+        max_workers: int = 4,
+        requests_per_second: float = 10.0,
+        page_size: int = 100
+    ):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.session = create_session(pool_size=max_workers)
+        self.limiter = RateLimiter(requests_per_second)
+
+    def _partition(self, symbol: str, day: pd.Timestamp) -> str:
+        return os.path.join(
+            self.cache_dir, 'trades', f"symbol={symbol}", f"date={day.strftime('%Y-%m-%d')}"
+        )
+
+    def cached_days(self, symbol: str) -> List[str]:
+        root = os.path.join(self.cache_dir, 'trades', f"symbol={symbol}")
+        if not os.path.isdir(root):
+            return []
+        return sorted(d[len('date='):] for d in os.listdir(root) if d.startswith('date='))
+
+    def _get(self, path: str, params: dict) -> list:
+        self.limiter.acquire()
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=10)
+        response.raise_for_status()
+        payload = response.json()
+        if str(payload.get('code', '0')) != '0':
+            raise RuntimeError(f"OKX error {payload.get('code')}: {payload.get('msg')}")
+        return payload.get('data', [])
+
+    def _download_window(self, symbol: str, start_ms: int, end_ms: int) -> list:
+        """Page backwards from ``end_ms`` until trades older than ``start_ms`` appear."""
+        # The first page is found by time; later pages continue by trade id.
+        # Paging by timestamp would skip the rest of a busy boundary millisecond
+        params = {'instId': symbol, 'type': 2, 'after': end_ms, 'limit': self.page_size}
+        last_id = None
+        rows = []
+        while True:
+            page = self._get('/market/history-trades', params)
+            if not page:
+                break
+            for trade in page:
+                ts = int(trade.get('ts', 0))
+                if start_ms <= ts < end_ms:
+                    rows.append((
+                        trade.get('tradeId'),
+                        ts,
+                        safe_float_conversion(trade.get('px')),
+                        safe_float_conversion(trade.get('sz')),
+                        trade.get('side', 'unknown')
+                    ))
+            oldest = min(int(trade.get('ts', 0)) for trade in page)
+            oldest_id = min(int(trade.get('tradeId', 0)) for trade in page)
+            if oldest < start_ms or (last_id is not None and oldest_id >= last_id):
+                break
+            last_id = oldest_id
+            params = {'instId': symbol, 'type': 1, 'after': oldest_id, 'limit': self.page_size}
+        return rows
+
+    @staticmethod
+    def _to_frame(rows: list) -> pd.DataFrame:
+        frame = pd.DataFrame(rows, columns=TRADE_COLUMNS)
+        frame = frame.drop_duplicates('trade_id').sort_values('timestamp', kind='stable')
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], unit='ms')
+        return frame.reset_index(drop=True)
+
+    def _cached_part(self, symbol: str, day: pd.Timestamp):
+        """(file name, ms the cached trades cover up to) for a day, or (None, None)."""
+        directory = self._partition(symbol, day)
+        names = os.listdir(directory) if os.path.isdir(directory) else []
+        if COMPLETE_PART in names:
+            return COMPLETE_PART, int(day.value // 1_000_000) + DAY_MS
+        prefix, suffix = PARTIAL_PART.split('{until}')
+        partial = [
+            int(name[len(prefix):-len(suffix)]) for name in names
+            if name.startswith(prefix) and name.endswith(suffix)
+        ]
+        if not partial:
+            return None, None
+        until = max(partial)
+        return PARTIAL_PART.format(until=until), until
+
+    def _load_day(self, symbol: str, day: pd.Timestamp) -> pd.DataFrame:
+        name, _ = self._cached_part(symbol, day)
+        if name is None:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return pd.read_parquet(os.path.join(self._partition(symbol, day), name))
+
+    def _store_day(self, symbol: str, day: pd.Timestamp, frame: pd.DataFrame, until: Optional[int] = None) -> None:
+        """Write a day's partition; ``until`` marks a day still in progress."""
+        directory = self._partition(symbol, day)
+        os.makedirs(directory, exist_ok=True)
+        name = COMPLETE_PART if until is None else PARTIAL_PART.format(until=until)
+        # Write then rename so a crash never leaves a half-written partition
+        tmp = os.path.join(directory, f".{name}.tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(directory, name))
+        # Older parts are superseded only once the new one is in place
+        for other in os.listdir(directory):
+            if other != name and other.endswith('.parquet'):
+                os.remove(os.path.join(directory, other))
+
+    def fetch_trades(self, symbol: str, start, end) -> pd.DataFrame:
+        """
+        Trades for ``symbol`` between ``start`` and ``end`` (UTC, inclusive days).
+        Only the hours missing from the cache, and already started, are downloaded.
+        """
+        days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D')
+        now_ms = int(time.time() * 1000)
+        # The hour in progress is fetched again next time; earlier ones are final
+        watermark = now_ms - now_ms % HOUR_MS
+
+        # Each day is split into hourly windows so one busy day still pages in parallel
+        windows = []
+        missing = []
+        for day in days:
+            day_start = int(day.value // 1_000_000)
+            _, until = self._cached_part(symbol, day)
+            first = day_start if until is None else until
+            hours = range(first, min(day_start + DAY_MS, now_ms), HOUR_MS)
+            if len(hours):
+                missing.append(day)
+                windows.extend((day, start_ms, start_ms + HOUR_MS) for start_ms in hours)
+
+        fresh = {}
+        if missing:
+            logging.info(f"Backfilling {len(windows)} hour(s) of {symbol} trades over {len(missing)} day(s)")
+            rows = {day: [] for day in missing}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(lambda w: self._download_window(symbol, w[1], w[2]), windows)
+                for (day, _, _), window_rows in zip(windows, results):
+                    rows[day].extend(window_rows)
+            for day in missing:
+                frame = self._to_frame(rows[day])
+                cached = self._load_day(symbol, day)
+                if not cached.empty:
+                    frame = pd.concat([cached, frame], ignore_index=True)
+                    frame = frame.drop_duplicates('trade_id').sort_values('timestamp', kind='stable')
+                    frame = frame.reset_index(drop=True)
+                fresh[day] = frame
+                day_end = int(day.value // 1_000_000) + DAY_MS
+                self._store_day(symbol, day, frame, None if day_end <= watermark else watermark)
+
+        frames = [fresh[d] if d in fresh else self._load_day(symbol, d) for d in days]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        trades = pd.concat(frames, ignore_index=True)
+        lower, upper = pd.Timestamp(start), pd.Timestamp(end)
+        if upper == upper.normalize():
+            upper = upper + pd.Timedelta(days=1)
+        return trades[(trades['timestamp'] >= lower) & (trades['timestamp'] < upper)].reset_index(drop=True)
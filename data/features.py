@@ -0,0 +1,184 @@
+import os
+import hashlib
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional
+from core.order_book import OrderBook
+from core.tick_buffer import TickBuffer
+from models.execution import walk_book_rows
+from .recorder import BookReplayer
+from config import FEATURE_DEPTH_BAND
+
+FEATURE_VERSION = 1
+SNAPSHOT_LEVELS = 20
+DEPTH_BAND = FEATURE_DEPTH_BAND  # the band the live engine prices with
+VOL_WINDOW = '5min'
+VOL_HORIZON_SECONDS = 86_400  # volatility is scaled to a daily horizon
+SLIPPAGE_FEATURES = ['order_size_ratio', 'volatility', 'spread']
+MAKER_TAKER_FEATURES = ['quantity', 'spread']
+
+
+def snapshots_from_recording(
+    root: str,
+    symbol: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    levels: int = SNAPSHOT_LEVELS,
+    chunk: int = 65_536
+) -> np.ndarray:
+    """Replay recorded segments and return one top-``levels`` snapshot row per update."""
+    buffer = TickBuffer(chunk, levels, overflow='drop')
+    chunks = []
+
+    def on_update(book, ts):
+        if buffer.unread == buffer.capacity:
+            chunks.append(buffer.drain().copy())
+        buffer.append_book(book, ts)
+
+    BookReplayer(root, symbol).run(OrderBook(symbol), on_update, start_ms, end_ms)
+    chunks.append(buffer.drain().copy())
+    return np.concatenate(chunks)
+
+
+def recording_fingerprint(root: str, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> str:
+    """Digest of the segments a replay over the range would read (name, size, mtime)."""
+    digest = hashlib.sha1()
+    for path in BookReplayer(root, symbol).segments(start_ms, end_ms):
+        info = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{info.st_size}:{info.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def depth_within_band(prices: np.ndarray, sizes: np.ndarray, mid: np.ndarray, band: float = DEPTH_BAND) -> np.ndarray:
+    """Row-wise quantity on levels within ``band`` of ``mid`` (either side)."""
+    mid = np.asarray(mid, dtype=float)[:, None]
+    inside = (prices > 0) & (np.abs(prices - mid) <= mid * band)
+    return np.where(inside, sizes, 0.0).sum(axis=1)
+
+
+def realized_volatility(timestamps: pd.Series, mid: pd.Series, window: str = VOL_WINDOW) -> pd.Series:
+    """Rolling realized volatility of mid log-returns, scaled to a daily horizon."""
+    returns = np.log(mid).diff().fillna(0.0)
+    squared = pd.Series(returns.values ** 2, index=pd.DatetimeIndex(timestamps))
+    variance = squared.rolling(window).sum().values
+    scale = VOL_HORIZON_SECONDS / pd.Timedelta(window).total_seconds()
+    return pd.Series(np.sqrt(variance * scale), index=mid.index)
+
+
+def snapshot_frame(snapshots: np.ndarray, window: str = VOL_WINDOW) -> pd.DataFrame:
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime(snapshots['ts'], unit='ms'),
+        'row': np.arange(len(snapshots)),
+        'best_bid': snapshots['best_bid'],
+        'best_ask': snapshots['best_ask'],
+        'mid': snapshots['mid']
+    })
+    frame = frame[frame['mid'] > 0]
+    frame['volatility'] = realized_volatility(frame['timestamp'], frame['mid'], window)
+    return frame
+
+
+def build_features(
+    trades: pd.DataFrame,
+    snapshots: np.ndarray,
+    band: float = DEPTH_BAND,
+    window: str = VOL_WINDOW
+) -> pd.DataFrame:
+    """
+    Join each trade to the last book snapshot at or before it and compute
+    model features plus the walk-the-book slippage label, all vectorized.
+    """
+    books = snapshot_frame(snapshots, window)
+    trades = trades.sort_values('timestamp', kind='stable')
+    joined = pd.merge_asof(trades, books, on='timestamp', direction='backward').dropna(subset=['row'])
+    rows = joined['row'].to_numpy(dtype=np.int64)
+    snaps = snapshots[rows]
+    mid = joined['mid'].to_numpy()
+    quantity = joined['quantity'].to_numpy(dtype=float)
+    side = joined['side'].to_numpy()
+
+    bid_depth = depth_within_band(snaps['bid_px'], snaps['bid_sz'], mid, band)
+    ask_depth = depth_within_band(snaps['ask_px'], snaps['ask_sz'], mid, band)
+    depth = bid_depth + ask_depth
+
+    # Buys lift the asks, sells hit the bids
+    is_buy = side == 'buy'
+    prices = np.where(is_buy[:, None], snaps['ask_px'], snaps['bid_px'])
+    sizes = np.where(is_buy[:, None], snaps['ask_sz'], snaps['bid_sz'])
+    walk = walk_book_rows(prices, sizes, quantity, np.where(is_buy, 'buy', 'sell'))
+
+    return pd.DataFrame({
+        'timestamp': joined['timestamp'].to_numpy(),
+        'price': joined['price'].to_numpy(),
+        'quantity': quantity,
+        'side': side,
+        'mid': mid,
+        'spread': (joined['best_ask'].to_numpy() - joined['best_bid'].to_numpy()) / mid,
+        'volatility': joined['volatility'].to_numpy(),
+        'bid_depth': bid_depth,
+        'ask_depth': ask_depth,
+        'depth': depth,
+        'imbalance': np.divide(bid_depth - ask_depth, depth, out=np.zeros(len(depth)), where=depth > 0),
+        'order_size_ratio': np.divide(quantity, depth, out=np.zeros(len(depth)), where=depth > 0),
+        'relative_price': (joined['price'].to_numpy() - mid) / mid,
+        'slippage': walk['slippage'],
+        'levels': walk['levels']
+    })
+
+
+def live_features(order_book, quantity: float, volatility: float, band: float = DEPTH_BAND) -> Dict[str, float]:
+    """The same features for one order against the current live book."""
+    bid_px, bid_sz = order_book.side_arrays('bids')
+    ask_px, ask_sz = order_book.side_arrays('asks')
+    mid = np.array([order_book.mid_price])
+    bid_depth = float(depth_within_band(bid_px[None, :], bid_sz[None, :], mid, band)[0])
+    ask_depth = float(depth_within_band(ask_px[None, :], ask_sz[None, :], mid, band)[0])
+    depth = bid_depth + ask_depth
+    return {
+        'quantity': quantity,
+        'spread': order_book.spread,
+        'volatility': volatility,
+        'bid_depth': bid_depth,
+        'ask_depth': ask_depth,
+        'depth': depth,
+        'imbalance': (bid_depth - ask_depth) / depth if depth > 0 else 0.0,
+        'order_size_ratio': quantity / depth if depth > 0 else 0.0
+    }
+
+
+class FeatureStore:
+    """
+    Features cached as Parquet, keyed by symbol, input range and parameters.
+
+    The key only covers what is passed in: callers building from recordings
+    that can still grow pass a ``recording_fingerprint`` as a parameter.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache"):
+        self.cache_dir = cache_dir
+
+    def path(self, symbol: str, start, end, **params) -> str:
+        key = json.dumps({
+            'symbol': symbol,
+            'start': str(pd.Timestamp(start)),
+            'end': str(pd.Timestamp(end)),
+            'version': FEATURE_VERSION,
+            **params
+        }, sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, 'features', f"symbol={symbol}", f"{digest}.parquet")
+
+    def load_or_build(self, symbol: str, start, end, builder: Callable[[], pd.DataFrame], **params) -> pd.DataFrame:
+        path = self.path(symbol, start, end, **params)
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+        features = builder()
+        if features.empty:
+            # Nothing to build from yet; don't pin the range to an empty result
+            return features
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        features.to_parquet(path, index=False)
+        logging.info(f"Cached {len(features)} feature rows at {path}")
+        return features
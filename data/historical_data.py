@@ -7,17 +7,28 @@ from typing import Dict, Any
 
 OKX_REST_URL = "https://www.okx.com/api/v5"
 
-def create_session() -> requests.Session:
-    """Create a requests session with retry logic."""
+_shared_session = None
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create a requests session with retry logic and a connection pool."""
     session = requests.Session()
     retries = Retry(
         total=3,
         backoff_factor=0.3,
-        status_forcelist=[500, 502, 503, 504]
+        status_forcelist=[429, 500, 502, 503, 504]
     )
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
     return session
 
+def get_session() -> requests.Session:
+    """Process-wide pooled session, so repeated calls reuse connections."""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = create_session()
+    return _shared_session
+
 def validate_timestamp(ts) -> pd.Timestamp:
     """Convert a millisecond timestamp to pandas datetime, or NaT on failure."""
     try:
@@ -37,7 +48,7 @@ def fetch_historical_trades(symbol: str, limit: int = 1000) -> pd.DataFrame:
     Fetch historical trades for a given symbol from OKX.
     Returns a pandas DataFrame with timestamp, price, quantity, and side.
     """
-    session = create_session()
+    session = get_session()
     try:
         response = session.get(
             f"{OKX_REST_URL}/market/trades",
@@ -64,7 +75,7 @@ def fetch_order_book_snapshots(symbol: str, depth: int = 10) -> Dict[str, Any]:
     Fetch order book snapshot for a given symbol from OKX.
     Returns a dict with bids, asks (as DataFrames), and timestamp.
     """
-    session = create_session()
+    session = get_session()
     try:
         response = session.get(
             f"{OKX_REST_URL}/market/books",
@@ -104,4 +115,29 @@ def fetch_order_book_snapshots(symbol: str, depth: int = 10) -> Dict[str, Any]:
             'bids': pd.DataFrame(columns=['price', 'quantity']),
             'asks': pd.DataFrame(columns=['price', 'quantity']),
             'timestamp': pd.NaT
-        }
\ No newline at end of file
+        }
+
+def fetch_instrument(symbol: str, inst_type: str = "SPOT") -> Dict[str, Any]:
+    """
+    Fetch instrument metadata for a symbol from OKX.
+    Returns a dict with tickSz and lotSz as strings, or an empty dict on failure.
+    """
+    session = get_session()
+    try:
+        response = session.get(
+            f"{OKX_REST_URL}/public/instruments",
+            params={"instType": inst_type, "instId": symbol},
+            timeout=10
+        )
+        response.raise_for_status()
+        data = response.json().get('data', [])
+        if not data:
+            logging.warning(f"No instrument data returned for {symbol}")
+            return {}
+        return {
+            'tickSz': data[0].get('tickSz'),
+            'lotSz': data[0].get('lotSz')
+        }
+    except Exception as e:
+        logging.error(f"Instrument fetch failed for {symbol}: {str(e)}")
+        return {}
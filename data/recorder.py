@@ -0,0 +1,178 @@
+import os
+import time
+import logging
+import numpy as np
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+# One row per price level change. Rows of the same book message share ``msg``.
+LEVEL_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('msg', 'i8'),
+    ('flags', 'u1'),
+    ('price', 'f8'),
+    ('qty', 'f8'),
+])
+ASK = 1
+SNAPSHOT = 2
+
+SEGMENT_FORMAT = "%Y%m%d-%H"
+SEGMENT_SUFFIX = ".bin"
+
+
+def segment_name(ts_ms: int) -> str:
+    """Hourly segment file name for a millisecond timestamp."""
+    hour = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+    return hour.strftime(SEGMENT_FORMAT) + SEGMENT_SUFFIX
+
+
+def open_segment(path: str) -> np.ndarray:
+    """Memory-map a segment read-only, ignoring a trailing partial row."""
+    rows = os.path.getsize(path) // LEVEL_DTYPE.itemsize
+    if rows == 0:
+        return np.empty(0, dtype=LEVEL_DTYPE)
+    return np.memmap(path, dtype=LEVEL_DTYPE, mode='r', shape=(rows,))
+
+
+class TickRecorder:
+    """
+    Append book messages to per-symbol, per-hour binary segments.
+    Rows are buffered and written in blocks; call flush()/close() on shutdown.
+    """
+
+    def __init__(self, root: str, flush_rows: int = 4096):
+        self.root = root
+        self.flush_rows = flush_rows
+        self._pending: Dict[str, List[tuple]] = {}
+        self._segment: Dict[str, str] = {}
+        # Seed from the clock so message ids never repeat across restarts
+        self._msg = time.time_ns()
+        self.rows_written = 0
+
+    def record(self, symbol: str, data: dict) -> None:
+        if 'data' not in data:
+            return
+        book = data['data'][0]
+        ts = int(book.get('ts', 0))
+        snapshot = data.get('action') == 'snapshot' or data.get('arg', {}).get('channel') == 'books5'
+        self._msg += 1
+
+        segment = segment_name(ts)
+        if self._segment.get(symbol) != segment:
+            self._flush_symbol(symbol)
+            self._segment[symbol] = segment
+
+        base = SNAPSHOT if snapshot else 0
+        rows = self._pending.setdefault(symbol, [])
+        msg = self._msg
+        for price, qty, *_ in book.get('bids', []):
+            rows.append((ts, msg, base, float(price), float(qty)))
+        for price, qty, *_ in book.get('asks', []):
+            rows.append((ts, msg, base | ASK, float(price), float(qty)))
+        if snapshot and not book.get('bids') and not book.get('asks'):
+            # Keep empty snapshots so replay still clears the book
+            rows.append((ts, msg, base, 0.0, 0.0))
+        if len(rows) >= self.flush_rows:
+            self._flush_symbol(symbol)
+
+    def _flush_symbol(self, symbol: str) -> None:
+        rows = self._pending.get(symbol)
+        if not rows:
+            return
+        directory = os.path.join(self.root, symbol)
+        os.makedirs(directory, exist_ok=True)
+        block = np.array(rows, dtype=LEVEL_DTYPE)
+        with open(os.path.join(directory, self._segment[symbol]), 'ab') as f:
+            f.write(block.tobytes())
+        self.rows_written += len(rows)
+        rows.clear()
+
+    def flush(self) -> None:
+        for symbol in list(self._pending):
+            self._flush_symbol(symbol)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class BookReplayer:
+    """Replay recorded segments for one symbol as OKX-style book messages."""
+
+    def __init__(self, root: str, symbol: str):
+        self.root = root
+        self.symbol = symbol
+
+    def segments(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[str]:
+        directory = os.path.join(self.root, self.symbol)
+        if not os.path.isdir(directory):
+            return []
+        names = sorted(n for n in os.listdir(directory) if n.endswith(SEGMENT_SUFFIX))
+        # Segment names sort by hour, so range filtering needs no file access
+        if start_ms is not None:
+            first = segment_name(start_ms)
+            names = [n for n in names if n >= first]
+        if end_ms is not None:
+            last = segment_name(end_ms)
+            names = [n for n in names if n <= last]
+        return [os.path.join(directory, n) for n in names]
+
+    def rows(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yield memory-mapped row blocks within [start_ms, end_ms], one per segment."""
+        for path in self.segments(start_ms, end_ms):
+            rows = open_segment(path)
+            ts = rows['ts']
+            lo = np.searchsorted(ts, start_ms, side='left') if start_ms is not None else 0
+            hi = np.searchsorted(ts, end_ms, side='right') if end_ms is not None else len(rows)
+            if hi > lo:
+                yield rows[lo:hi]
+
+    def messages(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[dict]:
+        for rows in self.rows(start_ms, end_ms):
+            msg = rows['msg']
+            bounds = np.concatenate(([0], np.flatnonzero(msg[1:] != msg[:-1]) + 1, [len(rows)]))
+            ts = rows['ts'].tolist()
+            flags = rows['flags'].tolist()
+            prices = rows['price'].tolist()
+            qtys = rows['qty'].tolist()
+            for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                bids, asks = [], []
+                for i in range(lo, hi):
+                    if prices[i]:
+                        (asks if flags[i] & ASK else bids).append((prices[i], qtys[i]))
+                yield {
+                    'arg': {'channel': 'replay', 'instId': self.symbol},
+                    'action': 'snapshot' if flags[lo] & SNAPSHOT else 'update',
+                    'data': [{'bids': bids, 'asks': asks, 'ts': ts[lo]}]
+                }
+
+    def run(
+        self,
+        order_book,
+        on_update: Optional[Callable] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        speed: Optional[float] = None
+    ) -> int:
+        """
+        Feed recorded messages through ``order_book.update``.
+        ``speed=None`` replays as fast as possible; otherwise it is a multiple
+        of real time. ``on_update(order_book, ts)`` runs after every message.
+        Returns the number of messages replayed.
+        """
+        count = 0
+        first_ts = None
+        wall_start = time.perf_counter()
+        for message in self.messages(start_ms, end_ms):
+            ts = message['data'][0]['ts']
+            if speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / 1000 / speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            order_book.update(message)
+            if on_update is not None:
+                on_update(order_book, ts)
+            count += 1
+        logging.info(f"Replayed {count} messages for {self.symbol}")
+        return count
@@ -1,9 +1,25 @@
 from .market_impact import MarketImpactCalculator
 from .slippage import SlippageModel
 from .maker_taker import MakerTakerPredictor
+from .execution import ExecutionEngine, walk_book, walk_book_rows
+from .scenario import cost_surface
+from .monte_carlo import MonteCarloSimulator
+from .online import OnlineLearner
+from .almgren_chriss import cost_variance, trajectory, efficient_frontier, admissible_slices, calibrate_impact
 
 __all__ = [
     'MarketImpactCalculator',
     'SlippageModel',
-    'MakerTakerPredictor'
+    'MakerTakerPredictor',
+    'ExecutionEngine',
+    'walk_book',
+    'walk_book_rows',
+    'cost_surface',
+    'MonteCarloSimulator',
+    'OnlineLearner',
+    'cost_variance',
+    'trajectory',
+    'efficient_frontier',
+    'admissible_slices',
+    'calibrate_impact'
 ]
\ No newline at end of file
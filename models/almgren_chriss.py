@@ -0,0 +1,182 @@
+import numpy as np
+
+DAILY_SECONDS = 86_400
+# Below this kappa * T the optimal schedule is indistinguishable from TWAP
+# and the sinh ratios lose precision, so the linear limit is used instead
+KAPPA_T_MIN = 1e-6
+
+
+def price_volatility(volatility, mid_price, horizon=DAILY_SECONDS):
+    """Convert a fractional volatility over ``horizon`` seconds to price units per sqrt(second)."""
+    return np.asarray(volatility, dtype=float) * np.asarray(mid_price, dtype=float) / np.sqrt(horizon)
+
+
+def _sinh_ratio(a, b):
+    """sinh(a) / sinh(b) for 0 <= a <= b without overflow."""
+    return np.exp(a - b) * np.expm1(-2 * a) / np.expm1(-2 * b)
+
+
+def _kappa(sigma, eta, gamma, risk_aversion, tau):
+    """
+    Decay rate of the optimal discrete schedule, plus the adjusted temporary
+    impact. Slices too long for the impact model (eta <= gamma * tau / 2)
+    have no optimum and come out as NaN.
+    """
+    eta_tilde = np.where(eta - 0.5 * gamma * tau > 0, eta - 0.5 * gamma * tau, np.nan)
+    kappa_tilde_sq = risk_aversion * sigma ** 2 / eta_tilde
+    return np.arccosh(1 + 0.5 * kappa_tilde_sq * tau ** 2) / tau, eta_tilde
+
+
+def admissible_slices(slices, horizon, eta, gamma):
+    """
+    ``slices`` raised where needed so each slice keeps at least half its
+    temporary impact after the permanent-impact adjustment (tau <= eta / gamma).
+    """
+    slices = np.asarray(slices, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        needed = np.ceil(np.asarray(gamma, dtype=float) * np.asarray(horizon, dtype=float) / eta)
+    return np.maximum(slices, np.nan_to_num(needed, nan=1.0, posinf=1.0))
+
+
+def cost_variance(size, sigma, eta, gamma, risk_aversion, horizon, slices, epsilon=0.0):
+    """
+    Closed-form expected cost and variance of the Almgren-Chriss optimal
+    schedule for selling (or buying) ``size`` over ``horizon`` seconds in
+    ``slices`` equal intervals.
+
+    ``sigma`` is price volatility per sqrt(second), ``eta`` the temporary
+    impact (price per unit of trading rate), ``gamma`` the permanent impact
+    (price per unit traded), ``epsilon`` the fixed cost per unit (half spread)
+    and ``risk_aversion`` lambda in 1/price. Every argument broadcasts, so a
+    whole grid of horizons and risk aversions is one call.
+
+    Returns expected cost and variance in price x size units (e.g. USD), the
+    utility E + lambda V and kappa.
+    """
+    size, sigma, eta, gamma, risk_aversion, horizon, slices, epsilon = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (size, sigma, eta, gamma, risk_aversion, horizon, slices, epsilon))
+    )
+    tau = horizon / slices
+    kappa, eta_tilde = _kappa(sigma, eta, gamma, risk_aversion, tau)
+    kT = kappa * horizon
+    X2 = size ** 2
+    fixed = 0.5 * gamma * X2 + epsilon * np.abs(size)
+
+    # Linear (TWAP) limit: sum n_j^2 = X^2 / N and sum x_j^2 = X^2 (N - 1)(2N - 1) / 6N
+    linear = kT < KAPPA_T_MIN
+    cost_linear = fixed + eta_tilde * X2 / horizon
+    var_linear = sigma ** 2 * tau * X2 * (slices - 1) * (2 * slices - 1) / (6 * slices)
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        k = np.where(linear, 1.0, kappa)
+        b = np.where(linear, 1.0, kT)
+        a = k * tau
+        # Overflow-safe forms of sinh(2b)/sinh(b)^2 = 2 coth(b), sinh(a)/sinh(b)^2
+        # and cosh(b - a) / (sinh(b) sinh(a)), with a = kappa tau <= b = kappa T
+        inv_sinh_b = 1 / np.sinh(b)
+        cost = fixed + eta_tilde * X2 * np.tanh(0.5 * a) * (
+            2 * tau / np.tanh(b) + 2 * horizon * _sinh_ratio(a, b) * inv_sinh_b
+        ) / (2 * tau ** 2)
+        cross = np.exp(-a) * (1 + np.exp(-2 * (b - a))) / -np.expm1(-2 * b) / np.sinh(a)
+        variance = 0.5 * sigma ** 2 * X2 * (tau * cross - horizon * inv_sinh_b ** 2)
+
+    cost = np.where(linear, cost_linear, cost)
+    # Rounding can leave a hair below zero when the order is done in one slice
+    variance = np.maximum(np.where(linear, var_linear, variance), 0.0)
+    return {
+        'expected_cost': cost,
+        'variance': variance,
+        'std': np.sqrt(variance),
+        'utility': cost + risk_aversion * variance,
+        'kappa': np.where(linear, 0.0, kappa)
+    }
+
+
+def trajectory(size, sigma, eta, gamma, risk_aversion, horizon, slices):
+    """
+    Optimal holdings x_0..x_N and child order sizes n_1..n_N for an integer
+    ``slices``; the other arguments broadcast and add leading dimensions.
+    """
+    slices = int(slices)
+    size, sigma, eta, gamma, risk_aversion, horizon = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (size, sigma, eta, gamma, risk_aversion, horizon))
+    )
+    tau = horizon / slices
+    kappa, _ = _kappa(sigma, eta, gamma, risk_aversion, tau)
+    kT = (kappa * horizon)[..., None]
+    # Fraction of the horizon remaining at each decision time
+    remaining = 1 - np.arange(slices + 1) / slices
+    with np.errstate(over='ignore', invalid='ignore'):
+        curved = _sinh_ratio(kT * remaining, kT)
+    fraction = np.where(kT < KAPPA_T_MIN, remaining, curved)
+    holdings = size[..., None] * fraction
+    return {
+        'times': horizon[..., None] * (1 - remaining),
+        'holdings': holdings,
+        'trades': -np.diff(holdings, axis=-1)
+    }
+
+
+def efficient_frontier(size, sigma, eta, gamma, risk_aversions, horizons, slices, epsilon=0.0):
+    """
+    Expected cost and variance over every (risk aversion, horizon) pair,
+    shaped (len(risk_aversions), len(horizons)). ``slices`` may be a scalar
+    or one value per horizon.
+    """
+    risk_aversions = np.asarray(risk_aversions, dtype=float)[:, None]
+    horizons = np.asarray(horizons, dtype=float)[None, :]
+    slices = np.asarray(slices, dtype=float)
+    if slices.ndim:
+        slices = slices[None, :]
+    result = cost_variance(size, sigma, eta, gamma, risk_aversions, horizons, slices, epsilon)
+    result['risk_aversions'] = risk_aversions[:, 0]
+    result['horizons'] = horizons[0]
+    return result
+
+
+def calibrate_impact(timestamps_ms, prices, quantities, sides, mids, interval=60.0):
+    """
+    Fit linear impact coefficients from trades tagged with the book mid at
+    trade time, bucketed into ``interval``-second windows:
+
+    - temporary: per-unit shortfall against mid = epsilon + eta * volume rate
+    - permanent: mid move to the next bucket = gamma * signed volume
+
+    Returns ``{'eta', 'gamma', 'epsilon', 'buckets'}``; coefficients are
+    clipped at zero so noisy fits never reward trading.
+    """
+    timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+    order = np.argsort(timestamps_ms, kind='stable')
+    prices = np.asarray(prices, dtype=float)[order]
+    quantities = np.asarray(quantities, dtype=float)[order]
+    mids = np.asarray(mids, dtype=float)[order]
+    sides = np.asarray(sides)[order]
+    sign = np.where((sides == 'buy') | (sides == 1), 1.0, -1.0)
+
+    bucket = timestamps_ms[order] // int(interval * 1000)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    inverse = np.cumsum(np.r_[False, bucket[1:] != bucket[:-1]])
+    volume = np.bincount(inverse, quantities)
+    signed = np.bincount(inverse, sign * quantities)
+    shortfall = np.bincount(inverse, sign * (prices - mids) * quantities)
+    if len(starts) < 3:
+        raise ValueError("Need trades in at least three intervals to calibrate impact")
+
+    # Temporary: least squares with intercept on per-bucket average shortfall
+    rate = volume / interval
+    unit_cost = shortfall / volume
+    A = np.column_stack([np.ones_like(rate), rate])
+    (epsilon, eta), *_ = np.linalg.lstsq(A, unit_cost, rcond=None)
+
+    # Permanent: mid change from one bucket's first trade to the next's
+    move = np.diff(mids[starts])
+    flow = signed[:-1]
+    denominator = np.dot(flow, flow)
+    gamma = np.dot(flow, move) / denominator if denominator > 0 else 0.0
+
+    return {
+        'eta': max(float(eta), 0.0),
+        'gamma': max(float(gamma), 0.0),
+        'epsilon': max(float(epsilon), 0.0),
+        'buckets': int(len(starts))
+    }
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+def walk_book(prices, quantities, sizes, side='buy'):
+    """
+    Fill market orders of every size in ``sizes`` against one side of the book.
+
+    ``prices``/``quantities`` are the opposite side's levels, best first.
+    Returns arrays (one entry per size) of filled quantity, notional, VWAP fill
+    price, levels consumed and slippage versus the best price (positive is a
+    cost for both buys and sells).
+    """
+    sizes = np.atleast_1d(np.asarray(sizes, dtype=float))
+    prices = np.asarray(prices, dtype=float)
+    quantities = np.asarray(quantities, dtype=float)
+    if len(prices) == 0:
+        nan = np.full(sizes.shape, np.nan)
+        return {
+            'filled': np.zeros(sizes.shape),
+            'notional': np.zeros(sizes.shape),
+            'vwap': nan,
+            'levels': np.zeros(sizes.shape, dtype=int),
+            'slippage': nan
+        }
+
+    cum_qty = np.cumsum(quantities)
+    cum_notional = np.cumsum(prices * quantities)
+    filled = np.minimum(sizes, cum_qty[-1])
+
+    # Level on which each order completes, and what the levels before it gave
+    idx = np.minimum(np.searchsorted(cum_qty, filled, side='left'), len(prices) - 1)
+    prev_qty = np.where(idx > 0, cum_qty[idx - 1], 0.0)
+    prev_notional = np.where(idx > 0, cum_notional[idx - 1], 0.0)
+    notional = prev_notional + (filled - prev_qty) * prices[idx]
+
+    best = prices[0]
+    vwap = np.divide(notional, filled, out=np.full(sizes.shape, best), where=filled > 0)
+    direction = 1.0 if side == 'buy' else -1.0
+    return {
+        'filled': filled,
+        'notional': notional,
+        'vwap': vwap,
+        'levels': np.where(filled > 0, idx + 1, 0),
+        'slippage': direction * (vwap - best) / best
+    }
+
+
+class ExecutionEngine:
+    def __init__(self, depth=None):
+        self.depth = depth
+
+    def walk(self, levels, sizes, side='buy'):
+        prices, quantities = levels
+        if self.depth is not None:
+            prices, quantities = prices[:self.depth], quantities[:self.depth]
+        return walk_book(prices, quantities, sizes, side)
+
+    def simulate(self, order_book, sizes, side='buy'):
+        levels = order_book.side_arrays('asks' if side == 'buy' else 'bids')
+        return self.walk(levels, sizes, side)
+
+    def slippage(self, order_book, size, side='buy'):
+        return float(self.simulate(order_book, size, side)['slippage'][0])
+
+
+def walk_book_rows(prices, quantities, sizes, side='buy'):
+    """
+    Row-wise walk: fill ``sizes[i]`` against the ladder in row ``i`` of the
+    2-D ``prices``/``quantities`` arrays (best first, zero-padded).
+    Returns the same fields as ``walk_book``, one entry per row.
+    """
+    prices = np.asarray(prices, dtype=float)
+    quantities = np.asarray(quantities, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    rows = np.arange(len(sizes))
+
+    cum_qty = np.cumsum(quantities, axis=1)
+    cum_notional = np.cumsum(prices * quantities, axis=1)
+    filled = np.minimum(sizes, cum_qty[:, -1])
+
+    idx = np.minimum((cum_qty < filled[:, None]).sum(axis=1), prices.shape[1] - 1)
+    prev_qty = np.where(idx > 0, cum_qty[rows, idx - 1], 0.0)
+    prev_notional = np.where(idx > 0, cum_notional[rows, idx - 1], 0.0)
+    notional = prev_notional + (filled - prev_qty) * prices[rows, idx]
+
+    best = prices[:, 0]
+    vwap = np.divide(notional, filled, out=best.copy(), where=filled > 0)
+    direction = np.where(np.asarray(side) == 'buy', 1.0, -1.0)
+    slippage = np.divide(direction * (vwap - best), best, out=np.full(len(sizes), np.nan), where=best > 0)
+    return {
+        'filled': filled,
+        'notional': notional,
+        'vwap': vwap,
+        'levels': np.where(filled > 0, idx + 1, 0),
+        'slippage': slippage
+    }
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class CompiledForest:
+    """
+    Flattened copy of a fitted sklearn regression forest.
+
+    All trees' nodes live in shared arrays, and every (tree, row) pair descends
+    one level per step, so a batch is scored in ``max_depth`` vectorized steps
+    instead of one Python call per tree. Leaves point at themselves, so rows
+    that finish early simply stay put.
+
+    Only plain arrays are kept, so a pickled forest loads memory-mapped with
+    ``joblib.load(..., mmap_mode='r')`` and needs no sklearn at inference.
+    """
+
+    def __init__(self, left, right, feature, threshold, value, roots, max_depth):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            nodes = np.arange(n)
+            leaf = tree.children_left == -1
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+        return cls(
+            np.concatenate(lefts),
+            np.concatenate(rights),
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(values),
+            np.array(roots),
+            depth
+        )
+
+    def predict_trees(self, X):
+        """Per-tree predictions, shape (n_trees, n_rows)."""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes]
+
+    def predict(self, X):
+        return self.predict_trees(X).mean(axis=0)
+
+    def quantiles(self, X, qs):
+        """Quantiles of the tree predictions, shape (len(qs), n_rows)."""
+        return np.quantile(self.predict_trees(X), qs, axis=0)
@@ -1,5 +1,6 @@
 import numpy as np
 import joblib
+import math
 import os
 from sklearn.linear_model import LogisticRegression
 
@@ -8,20 +9,56 @@ MODEL_PATH = "models/maker_taker_model.joblib"
 class MakerTakerPredictor:
     def __init__(self):
         self.model = None
+        # (intercept, coef array, coef list) swapped as one reference, so
+        # online updates never pause or tear a prediction
+        self._params = None
+        self.generation = 0
 
     def train(self, X, y):
         self.model = LogisticRegression()
         self.model.fit(X, y)
         joblib.dump(self.model, MODEL_PATH)
+        self._compile()
 
-    def load(self):
+    def load(self, mmap_mode=None):
         if os.path.exists(MODEL_PATH):
-            self.model = joblib.load(MODEL_PATH)
+            self.model = joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
+            self._compile()
         else:
             raise FileNotFoundError("Maker/Taker model not found. Please train it first.")
 
+    def _compile(self):
+        # Binary logistic regression: P(classes_[1]) = sigmoid(X @ coef + intercept)
+        self.set_coefficients(self.model.coef_, self.model.intercept_)
+
+    def set_coefficients(self, coef, intercept):
+        coef = np.asarray(coef, dtype=float).ravel()
+        self._params = (float(np.ravel(intercept)[0]), coef, coef.tolist())
+        self.generation += 1
+
+    @property
+    def coefficients(self):
+        if self._params is None:
+            self.load()
+        intercept, coef, _ = self._params
+        return coef.copy(), intercept
+
+    def predict_batch(self, X):
+        if self._params is None:
+            self.load()
+        intercept, coef, _ = self._params
+        X = np.asarray(X, dtype=float).reshape(-1, len(coef))
+        z = X @ coef + intercept
+        # Same stable form as the scalar path: exp never sees a large positive argument
+        e = np.exp(-np.abs(z))
+        return np.where(z >= 0, 1.0, e) / (1.0 + e)
+
     def predict_probability(self, order_size, normalized_price):
-        if self.model is None:
+        if self._params is None:
             self.load()
-        X = np.array([[order_size, normalized_price]])
-        return self.model.predict_proba(X)[0][1]
\ No newline at end of file
+        intercept, _, (a, b) = self._params
+        z = intercept + a * order_size + b * normalized_price
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
\ No newline at end of file
@@ -1,22 +1,95 @@
 import joblib
 import os
+import numpy as np
+from .almgren_chriss import (
+    cost_variance, trajectory, efficient_frontier, price_volatility, admissible_slices
+)
 
 MODEL_PATH = "models/market_impact_model.joblib"
 
+# Default schedule used when impact is quoted as a single number
+DEFAULT_HORIZON = 300.0    # seconds
+DEFAULT_SLICES = 10
+
 class MarketImpactCalculator:
-    def __init__(self, risk_aversion=0.1):
+    def __init__(self, risk_aversion=0.1, eta=None, gamma=None, epsilon=0.0,
+                 horizon=DEFAULT_HORIZON, slices=DEFAULT_SLICES):
         self.risk_aversion = risk_aversion
+        # Almgren-Chriss coefficients in quote currency per unit of base asset;
+        # None until calibrated from trades
+        self.eta = eta
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.horizon = horizon
+        self.slices = slices
+
+    @property
+    def calibrated(self):
+        return bool(self.eta) and self.gamma is not None
+
+    def params(self):
+        return {
+            'risk_aversion': self.risk_aversion,
+            'eta': self.eta,
+            'gamma': self.gamma,
+            'epsilon': self.epsilon,
+            'horizon': self.horizon,
+            'slices': self.slices
+        }
 
     def train(self, params):
         joblib.dump(params, MODEL_PATH)
 
-    def load(self):
+    def load(self, mmap_mode=None):
         if os.path.exists(MODEL_PATH):
-            self.risk_aversion = joblib.load(MODEL_PATH)
+            params = joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
+            # Older files hold only the risk aversion
+            if isinstance(params, dict):
+                for name, value in params.items():
+                    setattr(self, name, value)
+            else:
+                self.risk_aversion = params
         else:
             raise FileNotFoundError("Market impact model not found. Please train it first.")
 
-    def calculate_impact(self, order_size, volatility, liquidity):
+    def calculate_impact(self, order_size, volatility, liquidity, mid_price=None):
+        if self.calibrated and mid_price:
+            # Expected cost of the optimal schedule as a fraction of notional
+            cost = self.plan_cost(order_size, mid_price, volatility)['expected_cost']
+            return cost / (np.abs(order_size) * mid_price)
         temporary_impact = (order_size / liquidity) * volatility
         permanent_impact = 0.1 * temporary_impact
-        return temporary_impact + permanent_impact
\ No newline at end of file
+        return temporary_impact + permanent_impact
+
+    def _args(self, mid_price, volatility, risk_aversion):
+        if not self.calibrated:
+            raise ValueError("Impact coefficients are not calibrated; train with recorded trades first.")
+        sigma = price_volatility(volatility, mid_price)
+        lam = self.risk_aversion if risk_aversion is None else risk_aversion
+        return sigma, self.eta, self.gamma, lam
+
+    def _slices(self, horizon, slices):
+        # Slices too long for the calibrated impact have no optimal schedule
+        return admissible_slices(self.slices if slices is None else slices, horizon, self.eta, self.gamma)
+
+    def plan_cost(self, order_size, mid_price, volatility, horizon=None, slices=None, risk_aversion=None):
+        """Expected cost, variance and utility (quote currency) of the optimal schedule; broadcasts."""
+        sigma, eta, gamma, lam = self._args(mid_price, volatility, risk_aversion)
+        horizon = self.horizon if horizon is None else horizon
+        slices = self._slices(horizon, slices)
+        return cost_variance(order_size, sigma, eta, gamma, lam, horizon, slices, self.epsilon)
+
+    def plan(self, order_size, mid_price, volatility, horizon=None, slices=None, risk_aversion=None):
+        """Optimal child orders for one order, with its expected cost and risk."""
+        horizon = self.horizon if horizon is None else horizon
+        slices = int(self._slices(horizon, slices))
+        sigma, eta, gamma, lam = self._args(mid_price, volatility, risk_aversion)
+        schedule = trajectory(order_size, sigma, eta, gamma, lam, horizon, slices)
+        schedule.update(self.plan_cost(order_size, mid_price, volatility, horizon, slices, lam))
+        return schedule
+
+    def frontier(self, order_size, mid_price, volatility, horizons, risk_aversions, slices=None):
+        """Expected cost and variance over a (risk aversion, horizon) grid in one call."""
+        sigma, eta, gamma, _ = self._args(mid_price, volatility, None)
+        slices = self._slices(np.asarray(horizons, dtype=float), slices)
+        return efficient_frontier(order_size, sigma, eta, gamma, risk_aversions, horizons, slices, self.epsilon)
\ No newline at end of file
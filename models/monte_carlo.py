@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .execution import walk_book, walk_book_rows
+from config import MONTE_CARLO_PATHS, MONTE_CARLO_WORKERS, MONTE_CARLO_CHUNK
+
+DAILY_SECONDS = 86_400
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def synthetic_paths(prices, quantities, schedule, interval, volatility, paths, rng,
+                    side='buy', permanent_impact=0.0):
+    """
+    Execute ``schedule`` (child order sizes, one every ``interval`` seconds,
+    the first at once) on ``paths`` simulated books.
+
+    The mid follows a driftless lognormal walk with daily ``volatility``;
+    every level moves with it, so the book keeps the shape of the given
+    ladder (``prices``/``quantities``, best first, opposite side to the
+    order) and refills between child orders. ``permanent_impact`` shifts the
+    ladder by that much price per unit already executed.
+
+    Returns per-path (notional, filled) arrays.
+    """
+    schedule = np.asarray(schedule, dtype=float)
+    direction = 1.0 if side == 'buy' else -1.0
+    # One walk per child size: the book only rescales from path to path, so
+    # a fill's notional rescales with it
+    base = walk_book(prices, quantities, schedule, side)
+    step = volatility * np.sqrt(interval / DAILY_SECONDS)
+    increments = step * rng.standard_normal((paths, len(schedule))) - 0.5 * step ** 2
+    increments[:, 0] = 0.0
+    scale = np.exp(np.cumsum(increments, axis=1))
+    shift = direction * permanent_impact * np.concatenate([[0.0], np.cumsum(base['filled'])[:-1]])
+    notional = scale * base['notional'] + shift * base['filled']
+    filled = np.broadcast_to(base['filled'], notional.shape)
+    return notional.sum(axis=1), filled.sum(axis=1)
+
+
+def recorded_paths(snapshots, schedule, interval, paths, rng, side='buy', permanent_impact=0.0):
+    """
+    Execute ``schedule`` against recorded books: each path starts at a
+    random snapshot and sends child order ``j`` into the book as it stood
+    ``j * interval`` seconds later, so volatility, spread and depth come from
+    the recording (a block bootstrap). ``snapshots`` are ``TickBuffer`` rows.
+
+    Returns per-path (notional, filled, arrival mid) arrays.
+    """
+    schedule = np.asarray(schedule, dtype=float)
+    if len(snapshots) == 0:
+        raise ValueError("No recorded books to bootstrap from")
+    ts = snapshots['ts']
+    span = int(round(interval * 1000)) * (len(schedule) - 1)
+    last_start = np.searchsorted(ts, ts[-1] - span, side='right')
+    if last_start == 0:
+        raise ValueError("Recording is shorter than the execution schedule")
+    direction = 1.0 if side == 'buy' else -1.0
+    prefix = 'ask' if side == 'buy' else 'bid'
+    starts = rng.integers(0, last_start, paths)
+    notional = np.zeros(paths)
+    filled = np.zeros(paths)
+    for j, size in enumerate(schedule):
+        rows = snapshots[np.searchsorted(ts, ts[starts] + int(round(interval * 1000)) * j, side='right') - 1]
+        walk = walk_book_rows(rows[f'{prefix}_px'], rows[f'{prefix}_sz'], np.full(paths, size), side)
+        notional += walk['notional'] + direction * permanent_impact * filled * walk['filled']
+        filled += walk['filled']
+    return notional, filled, snapshots['mid'][starts]
+
+
+def _run_chunks(kind, arguments, chunks):
+    """Run (paths, seed) chunks in order; one task per worker ships ``arguments`` once."""
+    parts = []
+    for paths, seed in chunks:
+        rng = np.random.default_rng(seed)
+        if kind == 'synthetic':
+            parts.append(synthetic_paths(paths=paths, rng=rng, **arguments) + (None,))
+        else:
+            parts.append(recorded_paths(paths=paths, rng=rng, **arguments))
+    return parts
+
+
+class MonteCarloSimulator:
+    """
+    Cost distribution of an execution schedule over many simulated book
+    paths. Paths are split into fixed chunks with their own seeds and run on
+    a process pool when there is more than one chunk and worker, so a given
+    seed gives the same answer on any number of cores.
+    """
+
+    def __init__(self, paths=MONTE_CARLO_PATHS, workers=MONTE_CARLO_WORKERS, chunk=MONTE_CARLO_CHUNK,
+                 quantiles=QUANTILES, seed=None):
+        self.paths = paths
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk = chunk
+        self.quantiles = quantiles
+        self.seed = seed
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            # Spawned, so workers don't inherit the app's feed threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _run(self, kind, arguments, paths, seed):
+        paths = paths or self.paths
+        sizes = [min(self.chunk, paths - start) for start in range(0, paths, self.chunk)]
+        seeds = np.random.SeedSequence(self.seed if seed is None else seed).spawn(len(sizes))
+        chunks = list(zip(sizes, seeds))
+        if self.workers > 1 and len(chunks) > 1:
+            pool = self._executor()
+            tasks = min(self.workers, len(chunks))
+            futures = [pool.submit(_run_chunks, kind, arguments, chunks[i::tasks]) for i in range(tasks)]
+            results = [f.result() for f in futures]
+            # Back into chunk order, so the output doesn't depend on the worker count
+            parts = [results[i % tasks][i // tasks] for i in range(len(chunks))]
+        else:
+            parts = _run_chunks(kind, arguments, chunks)
+        return [None if parts[0][i] is None else np.concatenate([p[i] for p in parts]) for i in range(3)]
+
+    def simulate(self, order_book, schedule, interval, volatility, side='buy', permanent_impact=0.0,
+                 fee_rate=0.0, paths=None, seed=None):
+        """Distribution over synthetic paths around the current book and ``volatility``."""
+        with order_book.lock:
+            mid_price = order_book.mid_price
+            prices, quantities = order_book.side_arrays('asks' if side == 'buy' else 'bids')
+        if not mid_price:
+            raise ValueError("Order book is empty")
+        arguments = {
+            'prices': prices, 'quantities': quantities, 'schedule': schedule, 'interval': interval,
+            'volatility': volatility, 'side': side, 'permanent_impact': permanent_impact
+        }
+        notional, filled, _ = self._run('synthetic', arguments, paths, seed)
+        return self._summarize(notional, filled, mid_price, schedule, side, fee_rate)
+
+    def bootstrap(self, snapshots, schedule, interval, side='buy', permanent_impact=0.0,
+                  fee_rate=0.0, paths=None, seed=None):
+        """Distribution over block-bootstrapped windows of recorded book snapshots."""
+        arguments = {
+            'snapshots': snapshots, 'schedule': schedule, 'interval': interval,
+            'side': side, 'permanent_impact': permanent_impact
+        }
+        notional, filled, arrival = self._run('recorded', arguments, paths, seed)
+        return self._summarize(notional, filled, arrival, schedule, side, fee_rate)
+
+    def _summarize(self, notional, filled, arrival, schedule, side, fee_rate):
+        """
+        Implementation shortfall per path against the arrival mid, in quote
+        currency (positive is a cost), plus fees on the filled notional.
+        Quantity the book couldn't absorb is reported, not priced.
+        """
+        direction = 1.0 if side == 'buy' else -1.0
+        costs = direction * (notional - filled * arrival) + fee_rate * notional
+        bps = np.divide(costs, filled * arrival, out=np.full(len(costs), np.nan), where=filled > 0) * 1e4
+        tail = np.quantile(costs, 0.95)
+        return {
+            'costs': costs,
+            'cost_bps': bps,
+            'mean': float(costs.mean()),
+            'std': float(costs.std()),
+            'quantiles': {q: float(np.quantile(costs, q)) for q in self.quantiles},
+            'expected_shortfall_95': float(costs[costs >= tail].mean()),
+            'fill_rate': float(filled.mean() / np.sum(schedule)),
+            'paths': len(costs)
+        }
@@ -0,0 +1,249 @@
+import threading
+import warnings
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from .execution import walk_book_rows
+from config import ONLINE_BATCH, ONLINE_INTERVAL
+
+# A column whose first-batch std is below this fraction of its magnitude is
+# treated as constant: left unscaled and its coefficient kept as trained
+CONSTANT_TOLERANCE = 1e-8
+# Updates whose scaled coefficients grow past this multiple of the starting
+# ones (or past it in absolute terms for small ones) are rejected
+MAX_COEF_GROWTH = 100.0
+
+
+def trade_features(trades, ticks):
+    """
+    Model inputs and labels for a batch of ``TradeBuffer`` rows, with the
+    serving-time feature definitions the cost engine uses.
+
+    The slippage label walks each trade through the ``TickBuffer`` row in
+    force at its timestamp; trades older than the tick history, or larger
+    than its ladder, get no slippage label (NaN).
+    """
+    quantity = trades['size']
+    buy = trades['side'] == 1
+    depth = trades['feature_depth']
+    ratio = np.divide(quantity, depth, out=np.zeros(len(trades)), where=depth > 0)
+
+    slippage = np.full(len(trades), np.nan)
+    if len(ticks):
+        rows = np.searchsorted(ticks['ts'], trades['ts'], side='right') - 1
+        joined = rows >= 0
+        book = ticks[rows[joined]]
+        walk = walk_book_rows(
+            np.where(buy[joined, None], book['ask_px'], book['bid_px']),
+            np.where(buy[joined, None], book['ask_sz'], book['bid_sz']),
+            quantity[joined],
+            np.where(buy[joined], 'buy', 'sell')
+        )
+        complete = walk['filled'] >= quantity[joined]
+        slippage[np.flatnonzero(joined)[complete]] = walk['slippage'][complete]
+
+    return {
+        'maker_taker_X': np.column_stack([quantity, trades['spread']]),
+        'maker_taker_y': buy.astype(int),
+        'slippage_X': np.column_stack([ratio, trades['volatility'], trades['spread']]),
+        'slippage_y': slippage
+    }
+
+
+class OnlineModel:
+    """
+    A linear predictor kept current with ``partial_fit`` in standardized
+    feature space, starting from the offline coefficients.
+
+    Features are scaled with statistics frozen on the first batch, so the
+    learned coefficients keep one meaning and map back to raw features
+    exactly for the predictor's fast path. The predictor is looked up in
+    ``models`` each time, and a hot-reloaded one restarts the fit from its
+    new offline coefficients.
+
+    Columns constant within the first batch (spread often is: many trades
+    share one book state) can't be standardized, so they keep their offline
+    coefficient. An update with non-finite or runaway coefficients is not
+    served; the fit restarts from the coefficients still being served.
+    """
+
+    def __init__(self, models, name, estimator):
+        self.models = models
+        self.name = name
+        self.template = estimator
+        self.estimator = None
+        self.predictor = None
+        self.mean = None
+        self.scale = None
+        self.frozen = None
+        self.start = None
+        self.samples = 0
+        self.updates = 0
+        self.rejected = 0
+
+    @property
+    def fitting(self):
+        """True while a fit started from the predictor currently being served is under way."""
+        return self.mean is not None and self.models[self.name] is self.predictor
+
+    def partial_fit(self, X, y):
+        """Fit one batch and serve the result; returns False if the update was rejected."""
+        if not self.fitting:
+            self.predictor = self.models[self.name]
+            self.estimator = clone(self.template)
+            self.mean = X.mean(axis=0)
+            std = X.std(axis=0)
+            self.frozen = std <= CONSTANT_TOLERANCE * np.maximum(np.abs(self.mean), 1.0)
+            self.scale = np.where(self.frozen, 1.0, std)
+            coef, intercept = self.predictor.coefficients
+            # Offline coefficients expressed on the scaled features
+            self.start = coef * self.scale
+            init = {
+                'coef_init': self.start.copy(),
+                'intercept_init': np.array([intercept + coef @ self.mean])
+            }
+            try:
+                with warnings.catch_warnings():
+                    # One pass over the first batch, like every later partial_fit
+                    warnings.simplefilter('ignore')
+                    self.estimator.fit((X - self.mean) / self.scale, y, **init)
+            except Exception:
+                # Nothing was fitted; the next batch starts over
+                self.mean = None
+                raise
+        else:
+            self.estimator.partial_fit((X - self.mean) / self.scale, y)
+        # Works for the classifier's (1, n) and the regressor's (n,) coef_
+        self.estimator.coef_[..., self.frozen] = self.start[self.frozen]
+
+        scaled = np.ravel(self.estimator.coef_)
+        scaled_intercept = float(np.ravel(self.estimator.intercept_)[0])
+        limit = MAX_COEF_GROWTH * max(1.0, np.abs(self.start).max())
+        if not (np.isfinite(scaled).all() and np.isfinite(scaled_intercept)) or np.abs(scaled).max() > limit:
+            # Keep serving the last good set and start over from it next batch
+            self.rejected += 1
+            self.mean = None
+            return False
+        self.samples += len(y)
+        self.updates += 1
+        coef = scaled / self.scale
+        intercept = scaled_intercept - coef @ self.mean
+        # Serving threads keep predicting; they see the old or the new set
+        self.predictor.set_coefficients(coef, intercept)
+        return True
+
+
+class OnlineLearner:
+    """
+    Background worker that drains each symbol's trade buffer, joins the
+    trades to the book history and refits the maker/taker and linear
+    slippage models in mini-batches of at least ``batch_size`` trades.
+
+    The random-forest slippage quantiles stay as trained offline.
+    """
+
+    def __init__(self, client, models, batch_size=ONLINE_BATCH, interval=ONLINE_INTERVAL,
+                 learning_rate=0.01, alpha=1e-5):
+        self.client = client
+        self.models = models
+        self.batch_size = batch_size
+        self.interval = interval
+        # Constant step size so the models keep tracking regime changes
+        options = {'learning_rate': 'constant', 'eta0': learning_rate, 'alpha': alpha, 'max_iter': 1, 'tol': None}
+        self.maker_taker = OnlineModel(models, 'maker_taker', SGDClassifier(loss='log_loss', **options))
+        self.slippage = OnlineModel(models, 'slippage', SGDRegressor(**options))
+        self.pending = []
+        self.trades_seen = 0
+        self.last_error = None
+        self.running = False
+        self.thread = None
+        self._wake = threading.Event()
+
+    def collect(self):
+        """Drain new trades from every symbol into the pending batch; returns the count."""
+        collected = 0
+        for symbol, trades in list(self.client.trades.items()):
+            book = self.client.get_book(symbol)
+            ticks = self.client.ticks.get(symbol)
+            if book is None or ticks is None:
+                continue
+            # The feed thread appends under the book lock
+            with book.lock:
+                rows = trades.drain().copy()
+            if not len(rows):
+                continue
+            self.pending.append(trade_features(rows, ticks.latest().copy()))
+            collected += len(rows)
+        self.trades_seen += collected
+        return collected
+
+    def step(self):
+        """Fit on the pending trades if there are enough; returns True if models changed."""
+        self.collect()
+        if sum(len(p['maker_taker_y']) for p in self.pending) < self.batch_size:
+            return False
+        batch = {key: np.concatenate([p[key] for p in self.pending]) for key in self.pending[0]}
+        self.pending = []
+
+        fits = []
+        X, y = batch['maker_taker_X'], batch['maker_taker_y']
+        # Logistic loss needs both classes in the batch that starts the fit
+        if self.maker_taker.fitting or len(np.unique(y)) == 2:
+            fits.append((self.maker_taker, X, y))
+        X, y = batch['slippage_X'], batch['slippage_y']
+        labelled = np.isfinite(y) & np.isfinite(X).all(axis=1)
+        if labelled.any():
+            fits.append((self.slippage, X[labelled], y[labelled]))
+
+        # One model's failure doesn't cost the other its update
+        errors = []
+        for model, X, y in fits:
+            try:
+                model.partial_fit(X, y)
+            except Exception as e:
+                errors.append(f"{model.name}: {type(e).__name__}: {e}")
+        if errors:
+            raise RuntimeError('; '.join(errors))
+        return True
+
+    @property
+    def stats(self):
+        return {
+            'trades_seen': self.trades_seen,
+            'maker_taker_updates': self.maker_taker.updates,
+            'maker_taker_samples': self.maker_taker.samples,
+            'maker_taker_rejected': self.maker_taker.rejected,
+            'slippage_updates': self.slippage.updates,
+            'slippage_samples': self.slippage.samples,
+            'slippage_rejected': self.slippage.rejected,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        while self.running:
+            self._wake.wait(self.interval)
+            if not self.running:
+                break
+            try:
+                self.step()
+                self.last_error = None
+            except Exception as e:
+                # A bad batch is dropped; serving keeps the last good coefficients
+                self.pending = []
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Online learning error: {self.last_error}")
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._wake.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,59 @@
+import numpy as np
+from config import FEE_TIERS
+from .execution import walk_book
+
+
+def cost_surface(order_book, models, sizes_usd, volatilities, fee_tiers=None):
+    """
+    Full cost tensor over order size x volatility x fee tier against the current book.
+
+    Returns arrays shaped (len(sizes_usd), len(volatilities), len(fee_tiers))
+    for fees, slippage, impact and total cost (all in USD), plus the axes.
+    Everything is one broadcast evaluation; nothing loops over grid points.
+    """
+    sizes_usd = np.asarray(sizes_usd, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    fee_tiers = list(fee_tiers or FEE_TIERS)
+
+    with order_book.lock:
+        mid_price = order_book.mid_price
+        spread = order_book.spread
+        liquidity = order_book.liquidity_depth
+        depth = order_book.feature_depth
+        ask_levels = order_book.side_arrays('asks')
+    if not mid_price:
+        raise ValueError("Order book is empty")
+
+    quantity = sizes_usd / mid_price                                    # (S,)
+    order_value = quantity * mid_price                                  # (S,)
+    ratio = quantity / depth if depth > 0 else np.zeros_like(quantity)
+
+    # Slippage model over every (size, volatility) pair in one batch
+    S, V = len(sizes_usd), len(volatilities)
+    X = np.column_stack([
+        np.repeat(ratio, V),
+        np.tile(volatilities, S),
+        np.full(S * V, spread)
+    ])
+    slippage_rate = models['slippage'].predict_batch(X, quantile=False)['linear'].reshape(S, V)
+    impact_rate = models['impact'].calculate_impact(quantity[:, None], volatilities[None, :], liquidity, mid_price)
+    taker = np.array([FEE_TIERS[t]['taker'] for t in fee_tiers])
+
+    value = order_value[:, None, None]
+    fees = np.broadcast_to(value * taker[None, None, :], (S, V, len(fee_tiers)))
+    slippage = np.broadcast_to((slippage_rate * order_value[:, None])[:, :, None], fees.shape)
+    impact = np.broadcast_to((impact_rate * order_value[:, None])[:, :, None], fees.shape)
+    walk = walk_book(*ask_levels, quantity)
+
+    return {
+        'sizes_usd': sizes_usd,
+        'volatilities': volatilities,
+        'fee_tiers': fee_tiers,
+        'order_value': order_value,
+        'book_slippage': walk['slippage'],
+        'book_filled': np.divide(walk['filled'], quantity, out=np.ones_like(quantity), where=quantity > 0),
+        'fees': fees,
+        'slippage': slippage,
+        'impact': impact,
+        'total_cost': fees + slippage + impact
+    }
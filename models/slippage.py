@@ -4,32 +4,91 @@ import joblib
 import os
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
+from .forest import CompiledForest
 
 MODEL_PATH = "models/slippage_model.joblib"
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
 
 class SlippageModel:
     def __init__(self):
         self.linear_model = None
+        # CompiledForest of the quantile forest; the sklearn forest is only
+        # kept long enough to compile it
         self.quantile_model = None
+        # (intercept, coef array, coef list) of the linear model, swapped as
+        # one reference so online updates never tear a prediction
+        self._params = None
+        self.generation = 0
 
     def train(self, X, y):
         self.linear_model = LinearRegression()
         self.linear_model.fit(X, y)
-        self.quantile_model = RandomForestRegressor()
-        self.quantile_model.fit(X, y)
+        forest = RandomForestRegressor()
+        forest.fit(X, y)
+        # Persist the compiled arrays, so loading with mmap_mode pages them
+        # in from the file instead of holding a second copy on the heap
+        self.quantile_model = CompiledForest.from_sklearn(forest)
         joblib.dump((self.linear_model, self.quantile_model), MODEL_PATH)
+        self._compile()
 
-    def load(self):
+    def load(self, mmap_mode=None):
         if os.path.exists(MODEL_PATH):
-            self.linear_model, self.quantile_model = joblib.load(MODEL_PATH)
+            self.linear_model, self.quantile_model = joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
+            if isinstance(self.quantile_model, RandomForestRegressor):
+                # Files from before compiled forests were stored; retrain to mmap them
+                self.quantile_model = CompiledForest.from_sklearn(self.quantile_model)
+            self._compile()
         else:
             raise FileNotFoundError("Slippage model not found. Please train it first.")
 
+    def _compile(self):
+        # Pull the regression coefficients out once so inference skips sklearn
+        self.set_coefficients(self.linear_model.coef_, self.linear_model.intercept_)
+
+    def set_coefficients(self, coef, intercept):
+        coef = np.asarray(coef, dtype=float).ravel()
+        self._params = (float(np.ravel(intercept)[0]), coef, coef.tolist())
+        self.generation += 1
+
+    @property
+    def coefficients(self):
+        if self._params is None:
+            self.load()
+        intercept, coef, _ = self._params
+        return coef.copy(), intercept
+
+    def predict_linear(self, order_size_ratio, volatility, spread):
+        if self._params is None:
+            self.load()
+        intercept, _, (a, b, c) = self._params
+        return intercept + a * order_size_ratio + b * volatility + c * spread
+
+    def predict_quantiles(self, X, quantiles=QUANTILES):
+        """Per-row slippage quantiles across the forest's trees, keyed by quantile."""
+        if self.quantile_model is None:
+            self.load()
+        X = np.asarray(X, dtype=float).reshape(-1, len(self._params[1]))
+        values = self.quantile_model.quantiles(X, quantiles)
+        return dict(zip(quantiles, values))
+
+    def predict_batch(self, X, quantile=True):
+        if self._params is None:
+            self.load()
+        intercept, coef, _ = self._params
+        X = np.asarray(X, dtype=float).reshape(-1, len(coef))
+        result = {'linear': X @ coef + intercept}
+        if quantile:
+            result['quantiles'] = self.predict_quantiles(X)
+            result['quantile'] = result['quantiles'][0.95]
+        return result
+
     def predict(self, order_size_ratio, volatility, spread):
         if self.linear_model is None or self.quantile_model is None:
             self.load()
         X = np.array([[order_size_ratio, volatility, spread]])
+        quantiles = {q: float(v[0]) for q, v in self.predict_quantiles(X).items()}
         return {
-            'linear': self.linear_model.predict(X)[0],
-            'quantile': np.percentile(self.quantile_model.predict(X), 0.95)
+            'linear': self.predict_linear(order_size_ratio, volatility, spread),
+            'quantile': quantiles[0.95],
+            'quantiles': quantiles
         }
\ No newline at end of file
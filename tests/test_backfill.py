@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import pytest
+from data.backfill import HistoryDownloader, RateLimiter, HOUR_MS, COMPLETE_PART
+
+SYMBOL = 'BTC-USDT'
+DAY = pd.Timestamp('2024-01-02')
+DAY_MS = int(DAY.value // 1_000_000)
+
+
+class TradeServer:
+    """Stand-in for OKX ``/market/history-trades``: newest first, ``after`` exclusive."""
+
+    def __init__(self):
+        self.trades = []
+        self.requests = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                body = json.dumps({'code': '0', 'msg': '', 'data': server.page(params)}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}/api/v5"
+
+    def add(self, ts_ms, count):
+        """``count`` trades all stamped ``ts_ms``."""
+        with self.lock:
+            for _ in range(count):
+                trade_id = len(self.trades) + 1
+                self.trades.append({
+                    'instId': SYMBOL, 'tradeId': str(trade_id), 'px': '100', 'sz': '0.1',
+                    'side': 'buy' if trade_id % 2 else 'sell', 'ts': str(ts_ms)
+                })
+
+    def page(self, params):
+        with self.lock:
+            self.requests.append((time.monotonic(), params))
+            after = int(params['after'])
+            key = 'tradeId' if params.get('type') == '1' else 'ts'
+            older = [t for t in self.trades if int(t[key]) < after]
+        older.sort(key=lambda t: int(t['tradeId']), reverse=True)
+        return older[:int(params['limit'])]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    with TradeServer() as server:
+        yield server
+
+
+def downloader(server, tmp_path, **options):
+    options.setdefault('requests_per_second', 1_000.0)
+    return HistoryDownloader(cache_dir=str(tmp_path), base_url=server.url, page_size=100, **options)
+
+
+def test_pages_busy_milliseconds_by_trade_id(server, tmp_path):
+    # Several pages' worth of trades share each millisecond, on both sides of an hour boundary
+    for ts in (DAY_MS + HOUR_MS - 1, DAY_MS + HOUR_MS, DAY_MS + 5 * HOUR_MS + 7):
+        server.add(ts, 250)
+    trades = downloader(server, tmp_path).fetch_trades(SYMBOL, DAY, DAY)
+
+    assert len(trades) == 750
+    assert trades['trade_id'].is_unique
+    assert trades['timestamp'].is_monotonic_increasing
+    # After the first page of a window, paging continues by trade id
+    assert any(p.get('type') == '1' for _, p in server.requests)
+
+
+def test_completed_day_is_cached_atomically(server, tmp_path, monkeypatch):
+    server.add(DAY_MS + 1_000, 10)
+    history = downloader(server, tmp_path)
+    first = history.fetch_trades(SYMBOL, DAY, DAY)
+    partition = history._partition(SYMBOL, DAY)
+    assert os.listdir(partition) == [COMPLETE_PART]
+
+    # A completed day is never fetched again
+    server.requests.clear()
+    pd.testing.assert_frame_equal(history.fetch_trades(SYMBOL, DAY, DAY), first)
+    assert not server.requests
+
+    # A write that dies before the rename leaves the old partition readable
+    def crash(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, 'replace', crash)
+    with pytest.raises(OSError):
+        history._store_day(SYMBOL, DAY, first.iloc[:0])
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(history._load_day(SYMBOL, DAY), first)
+
+
+def test_current_day_fetches_only_new_hours(server, tmp_path):
+    now_ms = int(time.time() * 1000)
+    today = pd.Timestamp(now_ms, unit='ms').normalize()
+    today_ms = int(today.value // 1_000_000)
+    server.add(today_ms + 1, 5)
+    server.add(now_ms - 1, 5)
+    history = downloader(server, tmp_path)
+    assert len(history.fetch_trades(SYMBOL, today, today)) == 10
+    # Hours that haven't started are never requested
+    ends = [int(p['after']) for _, p in server.requests if p.get('type') == '2']
+    assert max(ends) <= now_ms - now_ms % HOUR_MS + HOUR_MS
+
+    # The next call only revisits the hour in progress and merges it with the cache
+    server.requests.clear()
+    server.add(int(time.time() * 1000), 3)
+    assert len(history.fetch_trades(SYMBOL, today, today)) == 13
+    windows = {int(p['after']) for _, p in server.requests if p.get('type') == '2'}
+    assert len(windows) == 1
+
+
+def test_rate_limiter_spaces_requests(server, tmp_path):
+    limiter = RateLimiter(20.0, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 5 / 20.0 * 0.9
+
+    # Requests from every download thread share the one bucket
+    server.add(DAY_MS + 1_000, 1)
+    downloader(server, tmp_path, requests_per_second=20.0, max_workers=4).fetch_trades(SYMBOL, DAY, DAY)
+    times = sorted(t for t, _ in server.requests)
+    assert len(times) >= 24
+    # A one-second burst, then no faster than the rate
+    assert times[-1] - times[0] >= (len(times) - 21) / 20.0 * 0.9
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from models.maker_taker import MakerTakerPredictor
+from models.slippage import SlippageModel
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def slippage_model(rng):
+    X = rng.normal(size=(500, 3))
+    y = X @ np.array([0.3, -1.2, 2.5]) + 0.1 + rng.normal(scale=0.05, size=500)
+    reference = LinearRegression().fit(X, y)
+    model = SlippageModel()
+    model.set_coefficients(reference.coef_, reference.intercept_)
+    return model, reference
+
+
+def maker_taker_model(rng):
+    X = rng.normal(size=(500, 2))
+    y = (X @ np.array([1.5, -0.8]) + rng.logistic(size=500) > 0).astype(int)
+    reference = LogisticRegression().fit(X, y)
+    model = MakerTakerPredictor()
+    model.set_coefficients(reference.coef_, reference.intercept_)
+    return model, reference
+
+
+def test_slippage_batch_matches_sklearn(rng):
+    model, reference = slippage_model(rng)
+    X = rng.normal(size=(1_000, 3))
+    np.testing.assert_allclose(model.predict_batch(X, quantile=False)['linear'], reference.predict(X), rtol=1e-12)
+
+
+def test_slippage_scalar_matches_sklearn(rng):
+    model, reference = slippage_model(rng)
+    for row in rng.normal(size=(50, 3)):
+        assert model.predict_linear(*row) == pytest.approx(reference.predict(row[None, :])[0], rel=1e-12)
+
+
+def test_maker_taker_batch_matches_sklearn(rng):
+    model, reference = maker_taker_model(rng)
+    X = rng.normal(size=(1_000, 2))
+    np.testing.assert_allclose(model.predict_batch(X), reference.predict_proba(X)[:, 1], rtol=1e-12)
+
+
+def test_maker_taker_scalar_matches_sklearn(rng):
+    model, reference = maker_taker_model(rng)
+    for row in rng.normal(size=(50, 2)):
+        assert model.predict_probability(*row) == pytest.approx(reference.predict_proba(row[None, :])[0, 1], rel=1e-12)
+
+
+def test_maker_taker_batch_saturates_without_overflow(rng):
+    model, _ = maker_taker_model(rng)
+    model.set_coefficients([1.0, 0.0], 0.0)
+    X = np.array([[-1e4, 0.0], [1e4, 0.0], [0.0, 0.0]])
+    with np.errstate(over='raise'):
+        probability = model.predict_batch(X)
+    np.testing.assert_array_equal(probability, [0.0, 1.0, 0.5])
+    assert [model.predict_probability(*row) for row in X] == list(probability)
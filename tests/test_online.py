@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+from core.order_book import OrderBook
+from core.tick_buffer import TickBuffer
+from core.trade_buffer import TradeBuffer
+from models.maker_taker import MakerTakerPredictor
+from models.online import OnlineLearner
+from models.slippage import SlippageModel
+
+SYMBOL = 'BTC-USDT'
+
+
+class Feed:
+    """Just the parts of the websocket client the learner reads."""
+
+    def __init__(self, book):
+        self.book = book
+        self.trades = {SYMBOL: TradeBuffer(1_000)}
+        self.ticks = {SYMBOL: TickBuffer(1_000)}
+
+    def get_book(self, symbol):
+        return self.book
+
+
+def make_book(bid, ask):
+    """A book whose volatility estimator has warmed up, ending at ``bid``/``ask``."""
+    book = OrderBook(SYMBOL)
+    for step in range(30, -1, -1):
+        shift = 0.01 * (step % 2)
+        book.update({
+            'arg': {'channel': 'books5', 'instId': SYMBOL},
+            'data': [{
+                'bids': [[f"{bid + shift - i:.2f}", '5', '0', '1'] for i in range(5)],
+                'asks': [[f"{ask + shift + i:.2f}", '5', '0', '1'] for i in range(5)],
+                'ts': str(1000 - 10 * step)
+            }]
+        })
+    assert book.stats.ready
+    return book
+
+
+def make_models():
+    maker_taker = MakerTakerPredictor()
+    maker_taker.set_coefficients([0.2, -5.0], 0.1)
+    slippage = SlippageModel()
+    slippage.set_coefficients([0.01, 0.001, 0.5], 0.0)
+    return {'maker_taker': maker_taker, 'slippage': slippage}
+
+
+def feed_trades(feed, count, rng, sides=('buy', 'sell')):
+    """``count`` trades that all arrive on the same book state, so spread is constant."""
+    feed.ticks[SYMBOL].append_book(feed.book, 1000)
+    trades = [{
+        'px': '100', 'sz': f"{size:.6f}", 'side': side, 'ts': str(1001 + i)
+    } for i, (size, side) in enumerate(zip(rng.exponential(0.5, count), rng.choice(sides, count)))]
+    feed.trades[SYMBOL].append_trades(trades, feed.book)
+
+
+def test_constant_spread_batch_keeps_coefficients_sane():
+    rng = np.random.default_rng(3)
+    feed = Feed(make_book(99.99, 100.01))
+    models = make_models()
+    learner = OnlineLearner(feed, models, batch_size=256)
+    feed_trades(feed, 300, rng)
+
+    assert learner.step()
+    assert learner.stats['maker_taker_updates'] == 1
+    assert learner.stats['slippage_updates'] == 1
+    coef, intercept = models['maker_taker'].coefficients
+    assert np.isfinite(coef).all() and np.isfinite(intercept)
+    # The constant column keeps its offline coefficient
+    assert coef[1] == pytest.approx(-5.0)
+    spread = feed.book.spread
+    low = models['maker_taker'].predict_probability(0.5, spread * 0.995)
+    high = models['maker_taker'].predict_probability(0.5, spread * 1.005)
+    assert abs(high - low) < 0.01
+    coef, intercept = models['slippage'].coefficients
+    assert np.isfinite(coef).all() and np.isfinite(intercept)
+    # Volatility and spread are constant in this batch too
+    assert coef[1:].tolist() == pytest.approx([0.001, 0.5])
+
+
+def test_runaway_update_is_rejected():
+    rng = np.random.default_rng(4)
+    feed = Feed(make_book(99.99, 100.01))
+    models = make_models()
+    learner = OnlineLearner(feed, models, batch_size=256, learning_rate=1e6, alpha=0.0)
+    before = models['slippage'].coefficients
+    feed_trades(feed, 300, rng)
+
+    learner.step()
+    assert learner.stats['maker_taker_rejected'] == 1
+    assert learner.stats['slippage_rejected'] == 1
+    # Serving keeps the offline set, and the next batch starts over from it
+    assert models['maker_taker'].coefficients[0].tolist() == [0.2, -5.0]
+    assert learner.maker_taker.mean is None
+    np.testing.assert_array_equal(models['slippage'].coefficients[0], before[0])
+
+
+def test_one_sided_batch_after_rejection_still_updates_slippage():
+    rng = np.random.default_rng(5)
+    feed = Feed(make_book(99.99, 100.01))
+    models = make_models()
+    learner = OnlineLearner(feed, models, batch_size=256, learning_rate=1e6, alpha=0.0)
+    feed_trades(feed, 300, rng)
+    learner.step()
+    assert learner.stats['maker_taker_rejected'] == 1
+    for model in (learner.maker_taker, learner.slippage):
+        model.template.set_params(eta0=0.01)
+
+    # No fit under way and only buys: maker/taker waits for a two-class batch
+    feed_trades(feed, 300, rng, sides=('buy',))
+    assert learner.step()
+    assert learner.stats['maker_taker_updates'] == 0
+    assert learner.stats['slippage_updates'] == 1
+
+
+def test_maker_taker_failure_keeps_slippage_update(monkeypatch):
+    rng = np.random.default_rng(6)
+    feed = Feed(make_book(99.99, 100.01))
+    learner = OnlineLearner(feed, make_models(), batch_size=256)
+    feed_trades(feed, 300, rng)
+
+    def fail(X, y):
+        raise ValueError("bad batch")
+    monkeypatch.setattr(learner.maker_taker, 'partial_fit', fail)
+    with pytest.raises(RuntimeError, match="maker_taker: ValueError: bad batch"):
+        learner.step()
+    assert learner.stats['slippage_updates'] == 1
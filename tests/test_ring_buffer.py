@@ -0,0 +1,24 @@
+import numpy as np
+from core.ring_buffer import RingBuffer, DROP
+
+DTYPE = [('value', 'i8')]
+
+
+def fill(buffer, values):
+    return [buffer.append((value,)) for value in values]
+
+
+def test_drop_keeps_latest_current_without_a_draining_consumer():
+    buffer = RingBuffer(DTYPE, 4, overflow=DROP)
+    assert all(fill(buffer, range(10)))
+    assert buffer.latest()['value'].tolist() == [6, 7, 8, 9]
+
+
+def test_drop_refuses_rows_once_a_consumer_falls_behind():
+    buffer = RingBuffer(DTYPE, 4, overflow=DROP)
+    fill(buffer, range(2))
+    assert buffer.drain()['value'].tolist() == [0, 1]
+    assert fill(buffer, range(2, 8)) == [True] * 4 + [False] * 2
+    assert buffer.dropped == 2
+    np.testing.assert_array_equal(buffer.drain()['value'], [2, 3, 4, 5])
+    assert fill(buffer, [8])
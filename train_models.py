@@ -1,22 +1,69 @@
+import argparse
 import numpy as np
+import pandas as pd
 from data.historical_data import fetch_historical_trades, fetch_order_book_snapshots
+from data.backfill import HistoryDownloader
+from data.features import (
+    FeatureStore, build_features, snapshots_from_recording, recording_fingerprint,
+    SLIPPAGE_FEATURES, MAKER_TAKER_FEATURES
+)
 from models.slippage import SlippageModel
 from models.maker_taker import MakerTakerPredictor
 from models.market_impact import MarketImpactCalculator
+from models.almgren_chriss import calibrate_impact
+from config import RECORDING_DIR
 
-symbol = "BTC-USDT"
-print("Fetching historical trades...")
-trades = fetch_historical_trades(symbol, 1000)
-if trades.empty:
-    raise RuntimeError("No historical data available for training.")
+parser = argparse.ArgumentParser(description="Train the cost models")
+parser.add_argument('--symbol', default="BTC-USDT")
+parser.add_argument('--start', help="First UTC day of training data, e.g. 2024-01-01")
+parser.add_argument('--end', help="Last UTC day of training data (defaults to --start)")
+parser.add_argument('--recordings', default=RECORDING_DIR, help="Recorded book segments directory")
+args = parser.parse_args()
+symbol = args.symbol
 
-# Dummy feature engineering for demonstration
-order_size_ratios = trades['quantity'] / trades['quantity'].max()
-volatility = np.full(len(trades), 0.02)
-spread = np.full(len(trades), 0.001)
-X = np.column_stack([order_size_ratios, volatility, spread])
-y_slippage = (trades['price'] - trades['price'].mean()) / trades['price'].mean()
-y_maker_taker = (trades['side'] == 'buy').astype(int).values
+features = None
+if args.start:
+    start = pd.Timestamp(args.start)
+    end = pd.Timestamp(args.end or args.start) + pd.Timedelta(days=1)
+    start_ms, end_ms = int(start.value // 1_000_000), int(end.value // 1_000_000)
+
+    def build():
+        print("Backfilling historical trades...")
+        trades = HistoryDownloader().fetch_trades(symbol, start, end)
+        print(f"Replaying recorded books for {len(trades)} trades...")
+        snapshots = snapshots_from_recording(args.recordings, symbol, start_ms, end_ms)
+        if trades.empty or len(snapshots) == 0:
+            return pd.DataFrame()
+        return build_features(trades, snapshots)
+
+    # New or extended segments for the range invalidate the cached features
+    recordings = recording_fingerprint(args.recordings, symbol, start_ms, end_ms)
+    features = FeatureStore().load_or_build(symbol, start, end, build, recordings=recordings)
+    if not features.empty:
+        features = features.dropna(subset=SLIPPAGE_FEATURES + ['slippage'])
+
+if features is not None and not features.empty:
+    print(f"Training on {len(features)} feature rows")
+    X = features[SLIPPAGE_FEATURES].to_numpy()
+    y_slippage = features['slippage'].to_numpy()
+    X_maker_taker = features[MAKER_TAKER_FEATURES].to_numpy()
+    y_maker_taker = (features['side'] == 'buy').astype(int).values
+else:
+    if args.start:
+        print("No recorded book data for that range; falling back to recent trades.")
+    print("Fetching historical trades...")
+    trades = fetch_historical_trades(symbol, 1000)
+    if trades.empty:
+        raise RuntimeError("No historical data available for training.")
+
+    # Dummy feature engineering for demonstration
+    order_size_ratios = trades['quantity'] / trades['quantity'].max()
+    volatility = np.full(len(trades), 0.02)
+    spread = np.full(len(trades), 0.001)
+    X = np.column_stack([order_size_ratios, volatility, spread])
+    y_slippage = (trades['price'] - trades['price'].mean()) / trades['price'].mean()
+    X_maker_taker = X[:, :2]
+    y_maker_taker = (trades['side'] == 'buy').astype(int).values
 
 print("Training slippage model...")
 slippage_model = SlippageModel()
@@ -24,10 +71,24 @@ slippage_model.train(X, y_slippage)
 
 print("Training maker/taker model...")
 maker_taker_model = MakerTakerPredictor()
-maker_taker_model.train(X[:, :2], y_maker_taker)
+maker_taker_model.train(X_maker_taker, y_maker_taker)
 
 print("Saving market impact model parameters...")
 impact_model = MarketImpactCalculator()
-impact_model.train(0.1)  # Save risk_aversion param
+impact_params = {'risk_aversion': 0.1}
+if features is not None and not features.empty:
+    timestamps = features['timestamp']
+    if pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = timestamps.astype('int64') // 1_000_000
+    try:
+        fit = calibrate_impact(
+            timestamps.to_numpy(), features['price'].to_numpy(), features['quantity'].to_numpy(),
+            features['side'].to_numpy(), features['mid'].to_numpy()
+        )
+        print(f"Calibrated impact over {fit.pop('buckets')} intervals: {fit}")
+        impact_params.update(fit)
+    except ValueError as e:
+        print(f"Keeping the heuristic impact model: {e}")
+impact_model.train(impact_params)
 
-print("All models trained and saved.")
\ No newline at end of file
+print("All models trained and saved.")